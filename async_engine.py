@@ -0,0 +1,128 @@
+#async_engine.py - Streams model replies with AsyncAnthropic on one event loop shared by all sessions
+
+import asyncio
+import queue
+import threading
+import time
+import anthropic
+import streamlit as st
+import config
+from http_pool import http_limits
+
+_DONE = object()
+
+class _Failed:
+    def __init__(self, error):
+        self.error = error
+
+@st.cache_resource
+def get_event_loop():
+    """Process-wide event loop running on a daemon thread."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="async-engine", daemon=True).start()
+    return loop
+
+@st.cache_resource
+def get_async_anthropic_client(api_key):
+    """Process-wide AsyncAnthropic client; only used from the shared event loop."""
+    http_client = anthropic.DefaultAsyncHttpxClient(limits=http_limits(), timeout=config.HTTP_TIMEOUT)
+    return anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client)
+
+class AsyncMessageStream:
+    """One messages.stream call running on the shared event loop.
+
+    Used like the synchronous MessageStream (`with ... as stream`, `stream.text_stream`,
+    `get_final_message()`, `current_message_snapshot`), but the HTTP request and SSE parsing
+    happen on the loop thread and text deltas are handed to the script thread via a queue.
+    Leaving the `with` block before the reply is complete cancels the generation.
+
+    While waiting for deltas, on_idle is called every poll_interval seconds. Rendering
+    something there lets Streamlit stop the script run (e.g. on Quit) even before the
+    first token arrives.
+    """
+
+    def __init__(self, client, request_kwargs, timeout=None, idle_timeout=None, on_idle=None, poll_interval=0.25):
+        self.timeout = config.ASYNC_STREAM_TIMEOUT if timeout is None else timeout
+        self.idle_timeout = config.ASYNC_STREAM_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.on_idle = on_idle
+        self.poll_interval = poll_interval
+        self._queue = queue.Queue()
+        self._finished = threading.Event()
+        self._stream = None
+        self._final_message = None
+        self._error = None
+        self._future = asyncio.run_coroutine_threadsafe(self._run(client, request_kwargs), get_event_loop())
+
+    # ----- event loop side -----
+
+    async def _run(self, client, request_kwargs):
+        try:
+            await asyncio.wait_for(self._consume(client, request_kwargs), self.timeout)
+            self._queue.put(_DONE)
+        except asyncio.TimeoutError:
+            self._error = TimeoutError(f"Model reply not finished after {self.timeout}s")
+            self._queue.put(_Failed(self._error))
+        except asyncio.CancelledError:
+            self._queue.put(_DONE)
+            raise
+        except Exception as e:
+            self._error = e
+            self._queue.put(_Failed(e))
+        finally:
+            self._finished.set()
+
+    async def _consume(self, client, request_kwargs):
+        async with client.messages.stream(**request_kwargs) as stream:
+            self._stream = stream
+            async for text in stream.text_stream:
+                self._queue.put(text)
+            self._final_message = await stream.get_final_message()
+
+    # ----- script thread side -----
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+
+    @property
+    def text_stream(self):
+        last_delta = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                if self.idle_timeout and time.monotonic() - last_delta > self.idle_timeout:
+                    self.cancel()
+                    raise TimeoutError(f"No reply from the model for {self.idle_timeout}s")
+                if self.on_idle is not None:
+                    self.on_idle()
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            last_delta = time.monotonic()
+            yield item
+
+    @property
+    def current_message_snapshot(self):
+        if self._stream is None:
+            raise RuntimeError("The stream has not started yet")
+        return self._stream.current_message_snapshot
+
+    def get_final_message(self):
+        """Wait for the reply to finish and return the final message."""
+        self._finished.wait()
+        if self._error is not None:
+            raise self._error
+        if self._final_message is None:
+            raise RuntimeError("The stream was cancelled before it finished")
+        return self._final_message
+
+    def cancel(self):
+        """Stop generating (closes the connection) and wait for the loop side to wind down."""
+        if not self._finished.is_set():
+            self._future.cancel()
+            self._finished.wait(timeout=5)
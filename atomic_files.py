@@ -0,0 +1,22 @@
+#atomic_files.py - Crash-safe file replacement shared by the transcript, backup, session and cache writers
+
+import os
+import tempfile
+
+def atomic_write(path, data):
+    """Replace path with the text data, so readers and crashes never see a half-written file.
+
+    The data goes to a uniquely named temporary file in the same directory first, so
+    concurrent writers of the same path never share a temporary file.
+    """
+    directory = os.path.dirname(path) or "."
+    with tempfile.NamedTemporaryFile("w", dir=directory, prefix=os.path.basename(path) + ".",
+                                     suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+        try:
+            f.write(data)
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
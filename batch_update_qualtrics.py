@@ -17,11 +17,17 @@ import os
 import sys
 import time
 import json
+import sqlite3
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
 from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
+from drive_service import build_drive_service
+import functools
+import itertools
 import io
 import re
 
@@ -31,21 +37,168 @@ import re
 QUALTRICS_API_TOKEN = os.environ.get('QUALTRICS_API_TOKEN')
 QUALTRICS_SURVEY_ID = os.environ.get('QUALTRICS_SURVEY_ID')
 QUALTRICS_DATACENTER = os.environ.get('QUALTRICS_DATACENTER', 'illinois')
+# Overrides https://{QUALTRICS_DATACENTER}.qualtrics.com, e.g. to run against fakes/qualtrics_server.py
+QUALTRICS_BASE_URL = os.environ.get('QUALTRICS_BASE_URL')
 
 # Google Drive Configuration
 GDRIVE_FOLDER_ID = os.environ.get('GDRIVE_FOLDER_ID')  # Your transcripts folder
+TRANSCRIPT_MIME_TYPE = 'text/plain'  # Only the .txt transcripts; the .jsonl copies are ignored
 GDRIVE_CREDENTIALS_JSON = os.environ.get('GDRIVE_CREDENTIALS_JSON')  # Service account JSON
 
 # Processing Configuration
 LOOKBACK_DAYS = 7  # How many days back to check for new transcripts
-RATE_LIMIT_DELAY = 2  # Seconds between API calls to avoid rate limiting
-MAX_RETRIES = 3  # Retry attempts for failed API calls
+RATE_LIMIT_DELAY = 2  # Base delay (seconds) for exponential backoff on failed API calls
+MAX_RETRIES = 3  # Retry attempts for failed API calls (Qualtrics updates and Drive listing pages)
+MAX_THROTTLED_RETRIES = 10  # Retry attempts after HTTP 429 (rate limited) responses
+MAX_WORKERS = int(os.environ.get('QUALTRICS_MAX_WORKERS', '8'))  # Concurrent Qualtrics updates
+# Requests per minute allowed by Qualtrics for the response endpoints (see the Qualtrics API
+# rate limit documentation for your brand); the limiter adapts downward on HTTP 429
+QUALTRICS_REQUESTS_PER_MINUTE = int(os.environ.get('QUALTRICS_REQUESTS_PER_MINUTE', '100'))
+# Local ledger of Response IDs already updated, so repeat runs skip them
+LEDGER_PATH = os.environ.get('QUALTRICS_LEDGER_PATH', 'qualtrics_processed.sqlite3')
+MAX_LEDGER_ATTEMPTS = 5  # Runs that retry a failed Response ID before giving up on it
+# 'changes': fetch only Drive changes since the last run (cursor stored in the ledger)
+# 'lookback': re-list every transcript modified in the last LOOKBACK_DAYS days
+GDRIVE_SYNC_MODE = os.environ.get('GDRIVE_SYNC_MODE', 'changes').lower()
+CHANGES_CURSOR_KEY = 'drive_changes_page_token'
+# Send a GET before each PUT to confirm the response exists (costs an extra API call per update)
+VERIFY_BEFORE_UPDATE = os.environ.get('QUALTRICS_VERIFY_BEFORE_UPDATE', 'false').lower() == 'true'
 DRY_RUN = False  # Set to True to test without making actual API calls
 
 # Email Configuration (optional)
 SEND_EMAILS = os.environ.get('SEND_DEBRIEFING_EMAILS', 'false').lower() == 'true'
 EMAIL_API_KEY = os.environ.get('EMAIL_API_KEY')  # SendGrid, Mailgun, etc.
 
+# ==================== RATE LIMITING ====================
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by all update workers.
+    Refills at `rate_per_minute`, halves its rate on HTTP 429 and
+    recovers additively after each successful call.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.max_rate = rate_per_minute / 60.0
+        self.min_rate = self.max_rate / 16
+        self.rate = self.max_rate
+        self.capacity = capacity or max(1, rate_per_minute // 10)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def backoff(self, retry_after=None):
+        """Slow down after a 429: pause everyone and halve the rate."""
+        with self.lock:
+            now = time.monotonic()
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self.paused_until = max(self.paused_until, now + pause)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.updated = now
+        log(f"  Rate limited; pausing {pause:.1f}s, rate now {self.rate * 60:.0f}/min", "WARN")
+
+    def success(self):
+        """Creep back toward the configured rate after a successful call."""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+rate_limiter = TokenBucket(QUALTRICS_REQUESTS_PER_MINUTE)
+
+def get_retry_after(response):
+    """Seconds to wait according to a Retry-After header, or None."""
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+# ==================== PROCESSED LEDGER ====================
+
+class ProcessedLedger:
+    """
+    SQLite record of Response ID update attempts and of the Drive sync cursor,
+    so scheduled runs only touch transcripts they have not handled yet.
+    Failed updates stay in the ledger and are retried by later runs.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed ("
+            " response_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " filename TEXT,"
+            " updated_at TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 1)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def processed_ids(self):
+        """All Response IDs recorded as successfully updated."""
+        return {row[0] for row in self.conn.execute(
+            "SELECT response_id FROM processed WHERE status = 'SUCCESS'"
+        )}
+
+    def retry_files(self, max_attempts):
+        """Transcripts whose update failed fewer than max_attempts times, as Drive-like file dicts."""
+        rows = self.conn.execute(
+            "SELECT filename FROM processed WHERE status != 'SUCCESS' AND attempts < ?",
+            (max_attempts,)
+        ).fetchall()
+        return [{'name': row[0]} for row in rows if row[0]]
+
+    def record(self, response_id, status, filename=None):
+        """Remember the outcome of an update attempt for a Response ID."""
+        self.conn.execute(
+            "INSERT INTO processed (response_id, status, filename, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(response_id) DO UPDATE SET status = excluded.status, filename = excluded.filename, "
+            "updated_at = excluded.updated_at, attempts = attempts + 1",
+            (response_id, status, filename, datetime.now().isoformat())
+        )
+        self.conn.commit()
+
+    def get_state(self, key):
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value)
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
 # ==================== HELPER FUNCTIONS ====================
 
 def log(message, level="INFO"):
@@ -64,8 +217,9 @@ def extract_response_id_from_filename(filename):
         return match.group(1)
     return None
 
+@functools.lru_cache(maxsize=None)
 def get_google_drive_service():
-    """Initialize Google Drive API service"""
+    """Initialize the Google Drive API service once per process"""
     try:
         # Try Render secret file first
         secret_file_path = '/etc/secrets/service-account.json'
@@ -93,45 +247,103 @@ def get_google_drive_service():
                 scopes=['https://www.googleapis.com/auth/drive.readonly']
             )
         
-        service = build('drive', 'v3', credentials=credentials)
+        service = build_drive_service(credentials)
         log("✓ Connected to Google Drive API")
         return service
     except Exception as e:
         log(f"✗ Failed to connect to Google Drive: {str(e)}", "ERROR")
         return None
 
-def get_recent_transcripts(service, days_back=7):
+def get_recent_transcripts(service, days_back=7, sync_state=None):
     """
-    Fetch list of transcript files from Google Drive folder
+    Yield transcript files from the Google Drive folder
     that were modified in the last N days.
+    Follows nextPageToken, requesting the next page while
+    the current one is being processed.
+    Sets sync_state['complete'] once every page has been read.
     """
-    try:
-        # Calculate cutoff date
-        cutoff_date = datetime.now() - timedelta(days=days_back)
-        cutoff_iso = cutoff_date.isoformat() + 'Z'
-        
-        # Query for files in the folder modified after cutoff
-        query = f"'{GDRIVE_FOLDER_ID}' in parents and modifiedTime > '{cutoff_iso}' and trashed=false"
-        
-        results = service.files().list(
+    # Calculate cutoff date
+    cutoff_date = datetime.now() - timedelta(days=days_back)
+    cutoff_iso = cutoff_date.isoformat() + 'Z'
+    
+    # Query for files in the folder modified after cutoff
+    query = (f"'{GDRIVE_FOLDER_ID}' in parents and mimeType = '{TRANSCRIPT_MIME_TYPE}' "
+             f"and modifiedTime > '{cutoff_iso}' and trashed=false")
+    
+    def fetch_page(page_token):
+        return service.files().list(
             q=query,
             pageSize=1000,
-            fields="files(id, name, modifiedTime)"
-        ).execute()
-        
-        files = results.get('files', [])
-        log(f"✓ Found {len(files)} transcripts from last {days_back} days")
-        return files
+            pageToken=page_token,
+            fields="nextPageToken, files(id, name, modifiedTime)"
+        ).execute(num_retries=MAX_RETRIES)
+    
+    total = 0
+    try:
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            page = prefetch.submit(fetch_page, None)
+            while page is not None:
+                results = page.result()
+                next_page_token = results.get('nextPageToken')
+                page = prefetch.submit(fetch_page, next_page_token) if next_page_token else None
+                
+                files = results.get('files', [])
+                total += len(files)
+                yield from files
+        log(f"✓ Found {total} transcripts from last {days_back} days")
+        if sync_state is not None:
+            sync_state['complete'] = True
+    except Exception as e:
+        log(f"✗ Failed to fetch transcripts after {total} files: {str(e)}", "ERROR")
+
+def get_start_page_token(service):
+    """Cursor for the current end of the Drive changes feed."""
+    return service.changes().getStartPageToken().execute(num_retries=MAX_RETRIES)['startPageToken']
+
+def get_changed_transcripts(service, page_token, sync_state):
+    """
+    Yield transcript files in the folder that were added or changed since
+    page_token, following the Drive changes feed page by page.
+    Stores the cursor for the next run in sync_state['new_start_page_token'].
+    """
+    total = 0
+    try:
+        while page_token:
+            results = service.changes().list(
+                pageToken=page_token,
+                pageSize=1000,
+                spaces='drive',
+                includeRemoved=False,
+                fields="nextPageToken, newStartPageToken, "
+                       "changes(fileId, removed, file(id, name, mimeType, modifiedTime, parents, trashed))"
+            ).execute(num_retries=MAX_RETRIES)
+            
+            for change in results.get('changes', []):
+                file = change.get('file')
+                if change.get('removed') or not file or file.get('trashed'):
+                    continue
+                if GDRIVE_FOLDER_ID not in file.get('parents', []):
+                    continue
+                if file.get('mimeType') != TRANSCRIPT_MIME_TYPE:
+                    continue
+                total += 1
+                yield file
+            
+            if 'newStartPageToken' in results:
+                sync_state['new_start_page_token'] = results['newStartPageToken']
+            page_token = results.get('nextPageToken')
+        log(f"✓ Found {total} new or changed transcripts since the last run")
+        sync_state['complete'] = True
     except Exception as e:
-        log(f"✗ Failed to fetch transcripts: {str(e)}", "ERROR")
-        return []
+        log(f"✗ Failed to fetch Drive changes after {total} files: {str(e)}", "ERROR")
 
-def update_qualtrics_response(response_id, retry_count=0):
+def update_qualtrics_response(response_id, retry_count=0, throttled_count=0):
     """
     Update a single Qualtrics response with ChatbotCompleted field.
     Returns: (success: bool, status: str)
     """
-    url = f"https://{QUALTRICS_DATACENTER}.qualtrics.com/API/v3/surveys/{QUALTRICS_SURVEY_ID}/responses/{response_id}"
+    base_url = QUALTRICS_BASE_URL or f"https://{QUALTRICS_DATACENTER}.qualtrics.com"
+    url = f"{base_url}/API/v3/surveys/{QUALTRICS_SURVEY_ID}/responses/{response_id}"
     headers = {
         "X-API-TOKEN": QUALTRICS_API_TOKEN,
         "Content-Type": "application/json"
@@ -148,19 +360,40 @@ def update_qualtrics_response(response_id, retry_count=0):
         return (True, "DRY_RUN")
     
     try:
-        # First, verify the response exists (GET request)
-        get_response = requests.get(url, headers={"X-API-TOKEN": QUALTRICS_API_TOKEN})
+        if VERIFY_BEFORE_UPDATE:
+            # Optionally verify the response exists (GET request) before updating it
+            rate_limiter.acquire()
+            get_response = requests.get(url, headers={"X-API-TOKEN": QUALTRICS_API_TOKEN})
+            
+            if get_response.status_code == 429:
+                rate_limiter.backoff(get_retry_after(get_response))
+                if throttled_count >= MAX_THROTTLED_RETRIES:
+                    return (False, "RATE_LIMITED")
+                return update_qualtrics_response(response_id, retry_count, throttled_count + 1)
+            elif get_response.status_code == 404:
+                log(f"  Response {response_id} not found in Qualtrics (404)", "WARN")
+                return (False, "NOT_FOUND")
+            elif get_response.status_code != 200:
+                log(f"  Unexpected status {get_response.status_code} for {response_id}", "WARN")
+                return (False, f"HTTP_{get_response.status_code}")
         
-        if get_response.status_code == 404:
+        # Update directly; a missing response is reported by the PUT itself
+        rate_limiter.acquire()
+        put_response = requests.put(url, headers=headers, json=payload)
+        if put_response.status_code == 429:
+            rate_limiter.backoff(get_retry_after(put_response))
+            if throttled_count >= MAX_THROTTLED_RETRIES:
+                return (False, "RATE_LIMITED")
+            return update_qualtrics_response(response_id, retry_count, throttled_count + 1)
+        elif put_response.status_code == 404:
             log(f"  Response {response_id} not found in Qualtrics (404)", "WARN")
             return (False, "NOT_FOUND")
-        elif get_response.status_code != 200:
-            log(f"  Unexpected status {get_response.status_code} for {response_id}", "WARN")
-            return (False, f"HTTP_{get_response.status_code}")
-        
-        # Response exists, now update it
-        put_response = requests.put(url, headers=headers, json=payload)
-        put_response.raise_for_status()
+        elif 400 <= put_response.status_code < 500:
+            # Other client errors will not succeed on retry
+            log(f"  Unexpected status {put_response.status_code} for {response_id}: {put_response.text}", "WARN")
+            return (False, f"HTTP_{put_response.status_code}")
+        put_response.raise_for_status()  # 5xx errors fall through to the retry logic
+        rate_limiter.success()
         
         log(f"  ✓ Successfully updated {response_id}")
         return (True, "SUCCESS")
@@ -173,7 +406,7 @@ def update_qualtrics_response(response_id, retry_count=0):
             retry_delay = RATE_LIMIT_DELAY * (2 ** retry_count)  # Exponential backoff
             log(f"  Retrying in {retry_delay}s... (attempt {retry_count + 1}/{MAX_RETRIES})")
             time.sleep(retry_delay)
-            return update_qualtrics_response(response_id, retry_count + 1)
+            return update_qualtrics_response(response_id, retry_count + 1, throttled_count)
         else:
             return (False, f"ERROR: {str(e)}")
 
@@ -192,11 +425,11 @@ def send_debriefing_email(response_id, email_address):
 
 # ==================== MAIN PROCESSING ====================
 
-def process_transcripts():
+def process_transcripts(drive_service=None):
     """
     Main processing function:
     1. Connect to Google Drive
-    2. Fetch recent transcripts
+    2. Fetch new transcripts (Drive changes feed or lookback window)
     3. Extract Response IDs
     4. Update Qualtrics for each ID
     """
@@ -217,53 +450,19 @@ def process_transcripts():
     log(f"Configuration:")
     log(f"  Survey ID: {QUALTRICS_SURVEY_ID}")
     log(f"  Datacenter: {QUALTRICS_DATACENTER}")
-    log(f"  Lookback: {LOOKBACK_DAYS} days")
+    log(f"  Sync mode: {GDRIVE_SYNC_MODE}" + (f" ({LOOKBACK_DAYS} days)" if GDRIVE_SYNC_MODE != 'changes' else ""))
+    log(f"  Workers: {MAX_WORKERS} (limit {QUALTRICS_REQUESTS_PER_MINUTE} requests/min)")
+    log(f"  Ledger: {LEDGER_PATH}")
     log(f"  Dry Run: {DRY_RUN}")
     log("")
     
     # Connect to Google Drive
-    drive_service = get_google_drive_service()
+    if drive_service is None:
+        drive_service = get_google_drive_service()
     if not drive_service:
         log("✗ Cannot proceed without Google Drive connection", "ERROR")
         sys.exit(1)
     
-    # Fetch recent transcripts
-    log(f"Fetching transcripts from last {LOOKBACK_DAYS} days...")
-    transcripts = get_recent_transcripts(drive_service, LOOKBACK_DAYS)
-    
-    if not transcripts:
-        log("No transcripts found. Exiting.")
-        return
-    
-    # Extract Response IDs
-    log("")
-    log("Extracting Response IDs from filenames...")
-    response_ids = []
-    for file in transcripts:
-        filename = file['name']
-        response_id = extract_response_id_from_filename(filename)
-        if response_id:
-            response_ids.append({
-                'response_id': response_id,
-                'filename': filename,
-                'modified_time': file.get('modifiedTime', 'unknown')
-            })
-            log(f"  Found: {response_id} in {filename}")
-        else:
-            log(f"  Skipped: {filename} (no Response ID found)", "WARN")
-    
-    log("")
-    log(f"Found {len(response_ids)} Response IDs to process")
-    
-    if not response_ids:
-        log("No Response IDs to process. Exiting.")
-        return
-    
-    # Update Qualtrics for each Response ID
-    log("")
-    log("Updating Qualtrics responses...")
-    log("-" * 60)
-    
     stats = {
         'success': 0,
         'not_found': 0,
@@ -271,29 +470,99 @@ def process_transcripts():
         'already_updated': 0
     }
     
-    for idx, item in enumerate(response_ids, 1):
-        response_id = item['response_id']
-        log(f"[{idx}/{len(response_ids)}] Processing {response_id}...")
-        
-        success, status = update_qualtrics_response(response_id)
-        
-        if success:
-            stats['success'] += 1
-        elif status == 'NOT_FOUND':
-            stats['not_found'] += 1
+    # Response IDs that earlier runs already marked complete are skipped
+    ledger = ProcessedLedger(LEDGER_PATH)
+    already_updated = ledger.processed_ids()
+    skipped_ids = set()  # a Response ID can appear in several files
+    pending = {}
+    
+    # Choose where transcripts come from: the Drive changes feed since the
+    # saved cursor, a one-off lookback scan to start the feed, or a lookback scan
+    sync_state = {}
+    if GDRIVE_SYNC_MODE == 'changes':
+        saved_cursor = ledger.get_state(CHANGES_CURSOR_KEY)
+        if saved_cursor:
+            log("Fetching Drive changes since the last run...")
+            transcripts = get_changed_transcripts(drive_service, saved_cursor, sync_state)
         else:
-            stats['error'] += 1
+            log(f"No saved Drive changes cursor; starting the feed with the last {LOOKBACK_DAYS} days...")
+            # Take the cursor first so files added during the listing show up next run.
+            # Older transcripts are left alone, as in lookback mode: re-updating them would
+            # overwrite their completion timestamps and could retrigger Qualtrics workflows
+            sync_state['new_start_page_token'] = get_start_page_token(drive_service)
+            transcripts = get_recent_transcripts(drive_service, LOOKBACK_DAYS, sync_state)
+    else:
+        log(f"Fetching transcripts from last {LOOKBACK_DAYS} days...")
+        transcripts = get_recent_transcripts(drive_service, LOOKBACK_DAYS)
+    
+    # Earlier failures are retried alongside the new transcripts
+    retry_files = ledger.retry_files(MAX_LEDGER_ATTEMPTS)
+    if retry_files:
+        log(f"Retrying {len(retry_files)} Response IDs that failed in earlier runs")
+    
+    # Transcripts are streamed page by page, and each Response ID is queued for
+    # update as soon as it is found; the shared token bucket keeps the
+    # concurrent updates within the API quota
+    log("Updating Qualtrics responses...")
+    log("-" * 60)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {}
+        for file in itertools.chain(retry_files, transcripts):
+            filename = file['name']
+            response_id = extract_response_id_from_filename(filename)
+            if not response_id:
+                log(f"  Skipped: {filename} (no Response ID found)", "WARN")
+                continue
+            if response_id in already_updated:
+                skipped_ids.add(response_id)
+                continue
+            if response_id in pending:
+                continue
+            
+            log(f"  Found: {response_id} in {filename}")
+            pending[response_id] = {
+                'response_id': response_id,
+                'filename': filename,
+                'modified_time': file.get('modifiedTime', 'unknown')
+            }
+            futures[executor.submit(update_qualtrics_response, response_id)] = response_id
         
-        # Rate limiting
-        if idx < len(response_ids):  # Don't sleep after last one
-            time.sleep(RATE_LIMIT_DELAY)
+        stats['already_updated'] = len(skipped_ids)
+        log(f"Skipping {stats['already_updated']} Response IDs already updated in earlier runs")
+        log(f"Found {len(futures)} Response IDs to process")
+        
+        for idx, future in enumerate(as_completed(futures), 1):
+            response_id = futures[future]
+            try:
+                success, status = future.result()
+            except Exception as e:
+                log(f"  ✗ Unexpected error for {response_id}: {str(e)}", "ERROR")
+                success, status = False, f"ERROR: {str(e)}"
+            log(f"[{idx}/{len(futures)}] {response_id}: {status}")
+            
+            if not DRY_RUN:
+                ledger.record(response_id, status, pending[response_id]['filename'])
+            
+            if success:
+                stats['success'] += 1
+            elif status == 'NOT_FOUND':
+                stats['not_found'] += 1
+            else:
+                stats['error'] += 1
+    
+    # Advance the changes cursor only once the whole feed was read;
+    # failed updates are already in the ledger for the next run
+    if sync_state.get('complete') and sync_state.get('new_start_page_token') and not DRY_RUN:
+        ledger.set_state(CHANGES_CURSOR_KEY, sync_state['new_start_page_token'])
+    ledger.close()
     
     # Summary
     log("")
     log("=" * 60)
     log("BATCH UPDATE COMPLETE")
     log("=" * 60)
-    log(f"Total processed: {len(response_ids)}")
+    log(f"Total processed: {len(pending)}")
+    log(f"  ↷ Already updated in earlier runs: {stats['already_updated']}")
     log(f"  ✓ Successfully updated: {stats['success']}")
     log(f"  ⚠ Not found in Qualtrics: {stats['not_found']}")
     log(f"  ✗ Errors: {stats['error']}")
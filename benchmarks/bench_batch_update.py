@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch_update_qualtrics.py against local fake Drive and Qualtrics servers
+==================================================================================
+
+Fills fakes.drive_server with synthetic transcripts (10k by default), then
+runs process_transcripts() end to end. Drive is reached through the real
+googleapiclient service and Qualtrics over HTTP with requests. Both fakes
+can add latency and answer a fraction of requests with 404, 429 or 503;
+Drive listing calls get 429s and 503s by default, to exercise their retries.
+Reports updates per second and p50/p95/p99 per-update latency, which
+includes rate-limiter waits and retries.
+
+A second run then picks up --new-files more transcripts through the Drive
+changes feed, to show the cost of an incremental run.
+
+Usage: python benchmarks/bench_batch_update.py [--transcripts N] [--workers W]
+       [--requests-per-minute R] [--latency S] [--not-found-rate P]
+       [--throttle-rate P] [--error-rate P]
+"""
+
+import argparse
+import contextlib
+import functools
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from google.auth.credentials import AnonymousCredentials
+from fakes.drive_server import FakeDriveServer
+from fakes.faults import FaultInjector, add_fault_arguments, faults_from_args
+from fakes.qualtrics_server import FakeQualtricsServer
+from drive_service import build_drive_service
+from benchmarks.reporting import print_report
+
+FOLDER_ID = "fake-transcripts-folder"
+API_TOKEN = "fake-token"
+
+def configure_batch_job(args, qualtrics, workdir):
+    """Import the batch job configured through its environment variables."""
+    os.environ.update({
+        "QUALTRICS_API_TOKEN": API_TOKEN,
+        "QUALTRICS_SURVEY_ID": "SV_fake",
+        "QUALTRICS_DATACENTER": "fake",
+        "QUALTRICS_BASE_URL": qualtrics.base_url,
+        "GDRIVE_FOLDER_ID": FOLDER_ID,
+        "QUALTRICS_LEDGER_PATH": os.path.join(workdir, "ledger.sqlite3"),
+        "QUALTRICS_MAX_WORKERS": str(args.workers),
+        "QUALTRICS_REQUESTS_PER_MINUTE": str(args.requests_per_minute),
+        "GDRIVE_SYNC_MODE": "changes",
+    })
+    import batch_update_qualtrics as batch
+    batch.RATE_LIMIT_DELAY = args.retry_delay
+    return batch
+
+def timed_run(batch, drive_service):
+    """Run process_transcripts with its log output discarded; returns (seconds, per-update latencies)."""
+    latencies = []
+    lock = threading.Lock()
+    update = batch.update_qualtrics_response
+
+    @functools.wraps(update)
+    def timed_update(response_id, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return update(response_id, *args, **kwargs)
+        finally:
+            # Retries recurse through the module global; only time the outermost call
+            if not args and not kwargs:
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+
+    batch.update_qualtrics_response = timed_update
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            batch.process_transcripts(drive_service)
+            elapsed = time.perf_counter() - start
+    finally:
+        batch.update_qualtrics_response = update
+    return elapsed, latencies
+
+def ledger_counts(path):
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT status, COUNT(*) FROM processed GROUP BY status").fetchall())
+
+def report(title, elapsed, latencies, qualtrics, successes_before):
+    successes = qualtrics.stats["PUT 200"] - successes_before
+    print_report(
+        f"{title}: {len(latencies)} updates in {elapsed:.2f}s",
+        {"update (incl. retries)": latencies},
+        {"updates/s": successes / elapsed, "attempted/s": len(latencies) / elapsed},
+    )
+    return successes
+
+def run(args):
+    qualtrics = FakeQualtricsServer(api_token=API_TOKEN, faults=faults_from_args(args, seed=1)).start()
+    drive_faults = FaultInjector(latency=args.drive_latency, throttle_rate=args.drive_throttle_rate,
+                                 error_rate=args.drive_error_rate, seed=2)
+    drive = FakeDriveServer(faults=drive_faults).start()
+    drive.drive.add_transcripts(FOLDER_ID, args.transcripts, seed=0)
+
+    workdir = tempfile.mkdtemp(prefix="bench_batch_update_")
+    batch = configure_batch_job(args, qualtrics, workdir)
+    drive_service = build_drive_service(AnonymousCredentials(), api_endpoint=drive.api_endpoint)
+
+    elapsed, latencies = timed_run(batch, drive_service)
+    successes = report(f"Full run over {args.transcripts} transcripts", elapsed, latencies, qualtrics, 0)
+
+    drive.drive.add_transcripts(FOLDER_ID, args.new_files, seed=3)
+    elapsed, latencies = timed_run(batch, drive_service)
+    report(f"Incremental run with {args.new_files} new transcripts", elapsed, latencies, qualtrics, successes)
+
+    print(f"  Qualtrics: {dict(qualtrics.stats)}")
+    print(f"  Drive:     {dict(drive.stats)}")
+    print(f"  Ledger:    {ledger_counts(batch.LEDGER_PATH)}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transcripts", type=int, default=10000, help="Synthetic transcripts in the Drive folder")
+    parser.add_argument("--new-files", type=int, default=100, help="Transcripts added before the incremental run")
+    parser.add_argument("--workers", type=int, default=8, help="QUALTRICS_MAX_WORKERS")
+    parser.add_argument("--requests-per-minute", type=int, default=60000,
+                        help="QUALTRICS_REQUESTS_PER_MINUTE (the production default is 100)")
+    parser.add_argument("--retry-delay", type=float, default=0.05,
+                        help="Base backoff for 5xx retries (RATE_LIMIT_DELAY, 2s in production)")
+    parser.add_argument("--drive-latency", type=float, default=0.0, help="Seconds added to every Drive request")
+    parser.add_argument("--drive-throttle-rate", type=float, default=0.1,
+                        help="Fraction of Drive requests answered with 429 (retried by the client library)")
+    parser.add_argument("--drive-error-rate", type=float, default=0.1, help="Fraction of Drive requests answered with 503")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    sys.exit(0 if run(args) else 1)
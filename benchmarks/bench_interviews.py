@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent interviews against a model engine
+=======================================================
+
+Runs N scripted participants through interview.py at the same time, each
+in its own Streamlit AppTest session. By default the Anthropic engine talks
+to fakes.anthropic_server, which streams replies at a configurable token
+rate and error rate, so the whole run is offline. --engine fake uses the
+in-process fake engine (no HTTP at all) with the same settings; with
+--api-key the anthropic and openai engines call the real provider, so
+providers and models can be compared on the same SYSTEM_PROMPT.
+Reports p50/p95/p99 turn latency as the participant sees it (one script
+run per answer), TTFT and stream times from the app's metrics file, and
+turn and interview throughput.
+
+AppTest swaps process-wide Streamlit state on every run, so each participant
+runs in its own process. Sessions therefore do not share st.cache_resource
+objects (API client pool, write-behind workers) the way they do on a single
+server; CPU contention inside one Streamlit process is not measured.
+
+Data, backups and metrics are written under a temporary directory.
+
+Usage: python benchmarks/bench_interviews.py [--sessions N] [--turns T]
+       [--tokens-per-second R] [--ttft S] [--error-rate P] [--base-url URL]
+       [--engine anthropic|openai|fake] [--model NAME] [--api-key KEY]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fakes.anthropic_server import FakeAnthropicServer
+from benchmarks.reporting import print_report
+
+APP_PATH = os.path.join(ROOT, "interview.py")
+
+BASE_URL_VARIABLES = {"anthropic": "ANTHROPIC_BASE_URL", "openai": "OPENAI_BASE_URL"}
+
+def configure_engine(settings):
+    """Select the engine in this worker's config module before interview.py runs."""
+    import config
+    config.ENGINE = settings["engine"]
+    if settings["model"]:
+        config.MODEL = settings["model"]
+    if settings["base_url"] and settings["engine"] in BASE_URL_VARIABLES:
+        os.environ[BASE_URL_VARIABLES[settings["engine"]]] = settings["base_url"]
+    if settings["engine"] == "fake":
+        from fakes.engine import FakeEngine
+        for name, value in settings["fake"].items():
+            setattr(FakeEngine, name, value)
+
+def run_session(index, workdir, settings, barrier, max_answers, timeout, results):
+    """Drive one interview to its closing message in a worker process; puts a result dict."""
+    # interview.py writes to ../data relative to the working directory
+    os.chdir(os.path.join(workdir, "app"))
+    configure_engine(settings)
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.secrets["API_KEY"] = settings["api_key"]
+    at.query_params["uid"] = f"R_bench{index:05d}"
+    result = {"opening": None, "turns": [], "completed": False, "errors": []}
+    # Load the app's heavy dependencies now so the opening run is not charged for them
+    import anthropic, googleapiclient.discovery  # noqa: F401
+    barrier.wait()
+
+    try:
+        start = time.perf_counter()
+        at.run()
+        result["opening"] = time.perf_counter() - start
+
+        for answer in range(max_answers):
+            if not at.session_state["interview_active"] or not at.chat_input:
+                break
+            start = time.perf_counter()
+            at.chat_input[0].set_value(f"Participant {index} answer {answer + 1}.").run()
+            result["turns"].append(time.perf_counter() - start)
+            if at.exception:
+                result["errors"].append(at.exception[0].message)
+                break
+        result["completed"] = not at.session_state["interview_active"]
+    except Exception as e:
+        result["errors"].append(str(e))
+    results.put(result)
+
+def read_turn_metrics(metrics_file):
+    """TTFT and stream durations recorded by the app's metrics module."""
+    ttft, stream = [], []
+    if os.path.exists(metrics_file):
+        with open(metrics_file) as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get("event") == "turn":
+                    if "ttft_s" in record:
+                        ttft.append(record["ttft_s"])
+                    stream.append(record["stream_s"])
+    return ttft, stream
+
+def run(args):
+    server = None
+    base_url = args.base_url
+    # Without an API key the anthropic engine is pointed at a local fake server
+    scripted = args.engine == "fake" or (args.engine == "anthropic" and not args.api_key and not base_url)
+    if scripted and args.engine == "anthropic":
+        server = FakeAnthropicServer(tokens_per_second=args.tokens_per_second, ttft=args.ttft,
+                                     error_rate=args.error_rate, turns=args.turns, seed=0).start()
+        base_url = server.base_url
+    if args.engine == "openai" and not args.api_key:
+        print("--engine openai needs --api-key")
+        return False
+    settings = {
+        "engine": args.engine,
+        "model": args.model,
+        "api_key": args.api_key or "fake-key",
+        "base_url": base_url,
+        "fake": {"tokens_per_second": args.tokens_per_second, "ttft": args.ttft,
+                 "error_rate": args.error_rate, "turns": args.turns},
+    }
+
+    workdir = tempfile.mkdtemp(prefix="bench_interviews_")
+    os.makedirs(os.path.join(workdir, "app"))
+
+    # Workers import Streamlit before the barrier, so start-up is not timed
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.sessions + 1)
+    queue = context.Queue()
+    processes = [
+        context.Process(target=run_session,
+                        args=(i, workdir, settings, barrier, args.turns + 2, args.timeout, queue))
+        for i in range(args.sessions)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    start = time.perf_counter()
+    results = [queue.get() for _ in processes]
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+
+    turns = [t for r in results for t in r["turns"]]
+    openings = [r["opening"] for r in results if r["opening"] is not None]
+    ttft, stream = read_turn_metrics(os.path.join(workdir, "data", "metrics", "metrics.jsonl"))
+    completed = sum(r["completed"] for r in results)
+
+    print_report(
+        f"{args.engine} engine ({args.model or 'config.MODEL'}), {args.sessions} concurrent sessions, "
+        f"{args.turns} answers each: {completed} completed in {elapsed:.1f}s",
+        {
+            "opening message": openings,
+            "answer -> reply": turns,
+            "TTFT (app metric)": ttft,
+            "stream (app metric)": stream,
+        },
+        {
+            "turns/s": (len(turns) + len(openings)) / elapsed,
+            "interviews/min": completed / elapsed * 60,
+        },
+    )
+    print(f"  data: {workdir}")
+    if server is not None:
+        print(f"  fake API: {server.stats}")
+    errors = [e for r in results for e in r["errors"]]
+    for error in errors[:10]:
+        print(f"  error: {error}")
+    # Live models decide for themselves when the interview is over
+    return (completed == args.sessions or not scripted) and not errors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent participants")
+    parser.add_argument("--turns", type=int, default=6, help="Answers per participant before the closing code")
+    parser.add_argument("--engine", choices=["anthropic", "openai", "fake"], default="anthropic",
+                        help="config.ENGINE for the sessions")
+    parser.add_argument("--model", help="config.MODEL for the sessions (default: the configured model)")
+    parser.add_argument("--api-key", help="Call the real provider API with this key instead of a fake")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="Fake API streaming rate")
+    parser.add_argument("--ttft", type=float, default=0.4, help="Fake API seconds before the first token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake API requests failing with 529")
+    parser.add_argument("--base-url", help="Use an already running fake server (or another API endpoint)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds allowed per script run")
+    args = parser.parse_args()
+    sys.exit(0 if run(args) else 1)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: question detection and single-question enforcement
+==============================================================
+
+Compares question_analysis against the original implementation (seven
+uncompiled re.search calls plus a full split on '?') over a corpus of
+interviewer responses, and checks that both produce the same result.
+
+Usage: python benchmarks/bench_question_analysis.py [--corpus FILE] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_analysis import count_questions, enforce_single_question
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "interviewer_responses.json")
+
+# ==================== ORIGINAL IMPLEMENTATION ====================
+
+def legacy_count_questions(text):
+    question_marks = text.count('?')
+    question_patterns = [
+        r'\bcan you tell me\b',
+        r'\bcan you describe\b',
+        r'\bwhat (?:do|did|does|is|are|was|were)\b',
+        r'\bhow (?:do|did|does|is|are|was|were)\b',
+        r'\bwhy (?:do|did|does)\b',
+        r'\bcould you\b',
+        r'\bwould you\b'
+    ]
+    pattern_count = sum(1 for pattern in question_patterns if re.search(pattern, text.lower()))
+    return max(question_marks, pattern_count)
+
+def legacy_enforce_single_question(response_text):
+    num_questions = legacy_count_questions(response_text)
+    if num_questions > 1:
+        parts = response_text.split('?')
+        if len(parts) > 1:
+            return parts[0] + '?'
+    return response_text
+
+# ==================== BENCHMARK ====================
+
+def run(corpus, repeat):
+    mismatches = [
+        text for text in corpus
+        if count_questions(text) != legacy_count_questions(text)
+        or enforce_single_question(text) != legacy_enforce_single_question(text)
+    ]
+
+    def per_response_us(func):
+        best = min(timeit.repeat(lambda: [func(text) for text in corpus], number=repeat, repeat=5))
+        return best / (repeat * len(corpus)) * 1e6
+
+    legacy = per_response_us(legacy_enforce_single_question)
+    current = per_response_us(enforce_single_question)
+
+    print(f"Corpus: {len(corpus)} responses, {sum(len(t) for t in corpus)} characters")
+    print(f"  original enforce_single_question: {legacy:8.2f} us/response")
+    print(f"  question_analysis:                {current:8.2f} us/response")
+    print(f"  speedup:                          {legacy / current:8.2f}x")
+    print(f"  mismatches:                       {len(mismatches)}")
+    for text in mismatches:
+        print(f"    - {text[:80]!r}")
+    return not mismatches
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSON list of response strings")
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the corpus per timing run")
+    args = parser.parse_args()
+
+    with open(args.corpus) as f:
+        corpus = json.load(f)
+    sys.exit(0 if run(corpus, args.repeat) else 1)
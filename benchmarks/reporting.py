@@ -0,0 +1,29 @@
+#benchmarks/reporting.py - Percentile and throughput summaries shared by the benchmark scripts
+
+import statistics
+
+def percentiles(values, points=(50, 95, 99)):
+    """Return {point: value} for the given percentiles (inclusive method)."""
+    if not values:
+        return {point: None for point in points}
+    if len(values) == 1:
+        return {point: values[0] for point in points}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {point: cuts[point - 1] for point in points}
+
+def format_latency_row(label, values, unit="s"):
+    """One report line: count, mean and p50/p95/p99 of a list of latencies."""
+    if not values:
+        return f"  {label:<24} n=0"
+    p = percentiles(values)
+    return (f"  {label:<24} n={len(values):<6} mean={statistics.fmean(values):8.3f}{unit}"
+            f"  p50={p[50]:8.3f}{unit}  p95={p[95]:8.3f}{unit}  p99={p[99]:8.3f}{unit}")
+
+def print_report(title, latencies, throughput):
+    """Print latency rows ({label: [values]}) and throughput rows ({label: value})."""
+    print(title)
+    print("-" * len(title))
+    for label, values in latencies.items():
+        print(format_latency_row(label, values))
+    for label, value in throughput.items():
+        print(f"  {label:<24} {value:10.2f}")
@@ -0,0 +1,54 @@
+#completion_index.py - In-memory index of Response IDs whose interview transcript has been saved
+
+import json
+import os
+import re
+import threading
+import streamlit as st
+from session_store import is_storable_response_id
+
+# Transcript files are named {model prefix}_{Response ID}_{YYYY-mm-dd_HH-MM-SS}.txt (or .jsonl)
+_TRANSCRIPT_NAME = re.compile(r"^[^_]+_(.+)_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.(?:txt|jsonl)$")
+
+def response_id_from_transcript_name(filename):
+    """Response ID embedded in a transcript file name, or None."""
+    match = _TRANSCRIPT_NAME.match(filename)
+    if match and is_storable_response_id(match.group(1)):
+        return match.group(1)
+    return None
+
+class CompletionIndex:
+    """Set of completed Response IDs: built by one directory scan, then updated on each final save."""
+
+    def __init__(self, directory):
+        self._lock = threading.Lock()
+        self._completed = set()
+        if os.path.isdir(directory):
+            for filename in os.listdir(directory):
+                response_id = response_id_from_transcript_name(filename)
+                if response_id is None and filename.endswith(".jsonl"):
+                    response_id = _response_id_from_header(os.path.join(directory, filename))
+                if response_id:
+                    self._completed.add(response_id)
+        print(f"[COMPLETION INDEX] {len(self._completed)} completed Response IDs in {directory}")
+
+    def add(self, response_id):
+        with self._lock:
+            self._completed.add(response_id)
+
+    def __contains__(self, response_id):
+        return response_id in self._completed
+
+def _response_id_from_header(path):
+    """Response ID from the header record of a JSONL transcript whose name does not carry it."""
+    try:
+        with open(path, "r") as f:
+            response_id = json.loads(f.readline()).get("response_id")
+    except (OSError, ValueError):
+        return None
+    return response_id if is_storable_response_id(response_id) else None
+
+@st.cache_resource
+def get_completion_index(directory):
+    """Process-wide completion index for a transcripts directory."""
+    return CompletionIndex(directory)
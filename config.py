@@ -145,10 +145,62 @@ SYSTEM_PROMPT = f"""{INTERVIEW_OUTLINE}
 {CODES}"""
 
 # API parameters
+ENGINE = "anthropic"  # Model provider: "anthropic", "openai" (needs the openai package) or "fake" (offline, scripted)
 MODEL = "claude-sonnet-4-20250514"  # Updated to Claude Sonnet 4 since claude-3-5-sonnet-20240620 is being retired 10/22/2025
 TEMPERATURE = None  # (None for default value)
 MAX_OUTPUT_TOKENS = 1024
 
+# Minimum seconds between re-renders of a streaming response
+STREAM_RENDER_INTERVAL = 0.05
+# ...and only once the text has grown by this fraction since the last render, so the bytes
+# re-sent per reply stay proportional to its length (each render re-sends the whole text)
+STREAM_RENDER_GROWTH = 0.25
+
+# Stop generating as soon as a reply asks a second question (it is cut at the first one anyway)
+STOP_AFTER_FIRST_QUESTION = True
+
+# Context window management: once the history sent to the model exceeds this many
+# (estimated) tokens, older turns are summarized in the background (None disables)
+CONTEXT_TOKEN_BUDGET = 12000
+CONTEXT_KEEP_RECENT_MESSAGES = 8  # Most recent messages always sent verbatim
+CONTEXT_SUMMARY_MODEL = None  # Model used for summaries (None uses MODEL)
+CONTEXT_SUMMARY_MAX_TOKENS = 1024
+CONTEXT_SUMMARY_WORKERS = 4  # Background summarization threads shared by all sessions
+
+# Prompt caching: mark the system prompt and the conversation prefix as cacheable
+PROMPT_CACHING = True
+
+# HTTP connection pool shared by every session's API client
+HTTP_MAX_CONNECTIONS = 200  # Upper bound on concurrent connections to the model API
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 100  # Idle connections kept open for TLS session reuse
+HTTP_KEEPALIVE_EXPIRY = 60.0  # Seconds an idle connection stays in the pool
+HTTP_TIMEOUT = 600.0  # Seconds before a request times out
+
+# Stream replies with AsyncAnthropic on one event loop thread shared by all sessions
+ASYNC_STREAMING = True
+ASYNC_STREAM_TIMEOUT = 300.0  # Seconds allowed for a whole reply before it is cancelled
+ASYNC_STREAM_IDLE_TIMEOUT = 60.0  # Seconds without a new token before the reply is cancelled
+
+# Background write-behind queue for backups and Google Drive uploads
+WRITE_BEHIND_WORKERS = 2  # Worker threads; each session is always handled by the same worker
+WRITE_BEHIND_QUEUE_SIZE = 100  # Pending snapshots per worker before new saves have to wait
+WRITE_BEHIND_FLUSH_TIMEOUT = 60  # Seconds to wait for pending writes at finalization and shutdown
+
+# Opening message cache: the first interviewer message is generated once per system prompt and
+# model, stored on disk, and replayed to new sessions at OPENING_STREAM_INTERVAL seconds per word
+OPENING_MESSAGE_CACHE = True
+OPENING_CACHE_DIRECTORY = "../data/opening_cache/"
+OPENING_STREAM_INTERVAL = 0.02
+
+# Durable session store, keyed by Response ID, so a refresh or reconnect resumes the interview
+SESSION_STORE_BACKEND = "sqlite"  # "sqlite", "file" (one JSON file per session) or None to disable
+SESSION_STORE_PATH = "../data/sessions/sessions.sqlite3"  # Database file, or directory for "file"
+
+# Latency instrumentation: per-turn timings (TTFT, stream duration, tokens/sec, enforcement)
+# and save/upload durations are appended as JSON lines to METRICS_FILE (None disables)
+METRICS_FILE = "../data/metrics/metrics.jsonl"
+METRICS_PROMETHEUS_PORT = None  # Serve /metrics in Prometheus text format on this port (e.g. 9464)
+
 # Display login screen with usernames and simple passwords for studies
 LOGINS = False
 
@@ -0,0 +1,94 @@
+#context_manager.py - Keeps the message history sent to the model within a token budget
+
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+import config
+from token_accounting import content_text, estimate_tokens
+
+SUMMARY_SYSTEM_PROMPT = """You are assisting an interviewer who is conducting a qualitative research interview.
+Summarize the earlier part of the interview below so the interviewer can continue it without the full transcript.
+Keep: which parts of the interview outline have been covered, the respondent's key statements, examples and
+preferences (in their own words where possible), and any open threads worth following up. Do not add commentary."""
+
+def message_text(message):
+    """Plain text of a message whose content is a string or a list of text blocks."""
+    return content_text(message["content"])
+
+@st.cache_resource
+def get_summary_executor():
+    """Process-wide worker pool for background summarization."""
+    return ThreadPoolExecutor(max_workers=config.CONTEXT_SUMMARY_WORKERS, thread_name_prefix="summarize")
+
+class ContextManager:
+    """Builds the request history for one session, condensing older turns when it grows too long.
+
+    The raw message list is never modified, so transcripts keep every turn. When the history
+    exceeds the budget, the older turns are summarized in the background and the summary is
+    used, once ready, in place of those turns on later requests.
+    """
+
+    def __init__(self, budget=None, keep_recent=None):
+        self.budget = config.CONTEXT_TOKEN_BUDGET if budget is None else budget
+        self.keep_recent = config.CONTEXT_KEEP_RECENT_MESSAGES if keep_recent is None else keep_recent
+        self.summary = None
+        self.summarized_count = 0  # leading raw messages covered by the summary
+        self._pending = None
+
+    def build_messages(self, engine, messages):
+        """Return the history to send: summary + recent turns, scheduling compaction if over budget."""
+        self._apply_finished_summary()
+        context = self._context(messages)
+
+        if self.budget and self._pending is None:
+            if sum(estimate_tokens(message_text(m)) for m in context) > self.budget:
+                self._schedule_summary(engine, messages)
+
+        return context
+
+    def _context(self, messages):
+        recent = [dict(m) for m in messages[self.summarized_count:]]
+        if self.summary and recent:
+            # Fold the summary into the first kept (user) message so roles still alternate
+            recent[0]["content"] = [
+                {"type": "text", "text": f"[Summary of the interview so far]\n{self.summary}"},
+                {"type": "text", "text": message_text(recent[0])},
+            ]
+        return recent
+
+    def _apply_finished_summary(self):
+        if self._pending is None or not self._pending.done():
+            return
+        future, self._pending = self._pending, None
+        try:
+            self.summary, self.summarized_count = future.result()
+            print(f"[CONTEXT] Condensed the first {self.summarized_count} messages into a summary")
+        except Exception as e:
+            print(f"[CONTEXT ERROR] Summarization failed: {str(e)}")
+
+    def _schedule_summary(self, engine, messages):
+        # Keep the most recent messages verbatim (always at least the latest one, which is
+        # the turn being answered) and start the kept part on a user turn
+        end = len(messages) - max(self.keep_recent, 1)
+        while end > self.summarized_count and messages[end]["role"] != "user":
+            end -= 1
+        if end <= self.summarized_count:
+            return
+
+        lines = []
+        if self.summary:
+            lines.append(f"Summary of the interview before this point:\n{self.summary}\n")
+        for message in messages[self.summarized_count:end]:
+            speaker = "Interviewer" if message["role"] == "assistant" else "Respondent"
+            lines.append(f"{speaker}: {message_text(message)}")
+
+        self._pending = get_summary_executor().submit(_summarize, engine, "\n\n".join(lines), end)
+
+def _summarize(engine, transcript, end):
+    """Runs on a worker thread: returns (summary, number of messages it covers)."""
+    summary = engine.complete(
+        SUMMARY_SYSTEM_PROMPT,
+        transcript,
+        max_tokens=config.CONTEXT_SUMMARY_MAX_TOKENS,
+        model=config.CONTEXT_SUMMARY_MODEL,
+    )
+    return summary, end
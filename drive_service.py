@@ -0,0 +1,33 @@
+#drive_service.py - Google Drive API service shared by the interview app and the batch job
+
+import threading
+import google_auth_httplib2
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest, build_http
+
+def build_drive_service(credentials, api_endpoint=None):
+    """Build a Drive v3 service that is cheap to reuse and safe to share across threads.
+
+    The discovery document bundled with google-api-python-client is used, so no network
+    discovery fetch is made. httplib2 connections are not thread-safe, so requests are
+    sent over a per-thread authorized connection while the credentials are shared.
+    build_http() gives each connection the client library's socket timeout, so a stalled
+    request fails instead of blocking its thread.
+    api_endpoint replaces https://www.googleapis.com/drive/v3/ (e.g. a local fake server).
+    """
+    local = threading.local()
+
+    def request_builder(http, *args, **kwargs):
+        if not hasattr(local, "http"):
+            local.http = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+        return HttpRequest(local.http, *args, **kwargs)
+
+    return build(
+        "drive",
+        "v3",
+        credentials=credentials,
+        requestBuilder=request_builder,
+        static_discovery=True,
+        cache_discovery=False,
+        client_options={"api_endpoint": api_endpoint} if api_endpoint else None,
+    )
@@ -0,0 +1,228 @@
+#engines.py - Model provider engines behind one interface: streaming, usage, cancellation, prompt caching
+
+from types import SimpleNamespace
+import streamlit as st
+import config
+from async_engine import AsyncMessageStream, get_async_anthropic_client
+from http_pool import http_limits
+
+# Speaker label used in usernames and transcripts for each engine
+ASSISTANT_LABELS = {
+    "anthropic": "Claude",
+    "openai": "ChatGPT",
+    "fake": "FakeModel",
+}
+
+def get_assistant_label(engine_name=None):
+    """Transcript label for the configured (or given) engine."""
+    return ASSISTANT_LABELS.get(engine_name or config.ENGINE, "Interviewer")
+
+def make_usage(input_tokens=0, output_tokens=0, cache_read_input_tokens=0, cache_creation_input_tokens=0):
+    """Token usage in the field names record_turn_usage reads (the Anthropic ones)."""
+    return SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_read_input_tokens=cache_read_input_tokens,
+        cache_creation_input_tokens=cache_creation_input_tokens,
+    )
+
+class Engine:
+    """Interface shared by the provider engines.
+
+    build_request(messages, context_manager) -> request for the current history, with the
+        system prompt, context management and the provider's prompt caching applied
+    stream(request, on_idle) -> context manager; iterate `text_stream` for text deltas and call
+        `usage(complete)` for the turn's token usage. Leaving the block before the reply is
+        complete cancels the generation.
+    complete(system, prompt, max_tokens, model) -> reply text of a non-streaming call
+    """
+
+    name = None
+
+    @property
+    def assistant_label(self):
+        return get_assistant_label(self.name)
+
+    def base_request(self):
+        request = {"model": config.MODEL, "max_tokens": config.MAX_OUTPUT_TOKENS}
+        if config.TEMPERATURE is not None:
+            request["temperature"] = config.TEMPERATURE
+        return request
+
+    def context_messages(self, messages, context_manager=None):
+        """History to send; older turns are replaced by a background summary once over budget."""
+        if context_manager is None:
+            return [dict(message) for message in messages]
+        return context_manager.build_messages(self, messages)
+
+# ===== ANTHROPIC =====
+@st.cache_resource
+def get_anthropic_client(api_key):
+    """Return a process-wide Anthropic client backed by a pooled, keep-alive HTTP client."""
+    import anthropic
+    http_client = anthropic.DefaultHttpxClient(limits=http_limits(), timeout=config.HTTP_TIMEOUT)
+    return anthropic.Anthropic(api_key=api_key, http_client=http_client)
+
+def build_cached_request(system_prompt, messages):
+    """Return (system, messages) with cache breakpoints on the system prompt and conversation prefix."""
+    system = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+    # Copy the history so the cache markers never leak into st.session_state.messages
+    cached_messages = [dict(message) for message in messages]
+
+    # Breakpoints move with the conversation: the latest user turn writes the prefix
+    # for the next request, the previous user turn reads what the last request wrote
+    user_indices = [i for i, message in enumerate(cached_messages) if message["role"] == "user"]
+    for i in user_indices[-2:]:
+        content = cached_messages[i]["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        else:
+            content = [dict(block) for block in content]
+        content[-1]["cache_control"] = {"type": "ephemeral"}
+        cached_messages[i]["content"] = content
+
+    return system, cached_messages
+
+class AnthropicEngine(Engine):
+    """Messages API; streams on the shared event loop when config.ASYNC_STREAMING is set."""
+
+    name = "anthropic"
+
+    def __init__(self, api_key):
+        self.client = get_anthropic_client(api_key)
+        self.async_client = get_async_anthropic_client(api_key) if config.ASYNC_STREAMING else None
+
+    def build_request(self, messages, context_manager=None):
+        request = self.base_request()
+        request["system"] = config.SYSTEM_PROMPT
+        request["messages"] = self.context_messages(messages, context_manager)
+        if config.PROMPT_CACHING:
+            request["system"], request["messages"] = build_cached_request(config.SYSTEM_PROMPT, request["messages"])
+        return request
+
+    def stream(self, request, on_idle=None):
+        if self.async_client is not None:
+            return _AnthropicStream(AsyncMessageStream(self.async_client, request, on_idle=on_idle))
+        return _AnthropicStream(self.client.messages.stream(**request))
+
+    def complete(self, system, prompt, max_tokens, model=None):
+        response = self.client.messages.create(
+            model=model or config.MODEL,
+            max_tokens=max_tokens,
+            system=system,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return "".join(block.text for block in response.content if block.type == "text")
+
+class _AnthropicStream:
+    """Wraps a sync MessageStream manager or an AsyncMessageStream."""
+
+    def __init__(self, manager):
+        self._manager = manager
+        self._stream = None
+
+    def __enter__(self):
+        self._stream = self._manager.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._manager.__exit__(*exc_info)
+
+    @property
+    def text_stream(self):
+        return self._stream.text_stream
+
+    def usage(self, complete=True):
+        # A cancelled stream only has the usage reported so far
+        if complete:
+            return self._stream.get_final_message().usage
+        return self._stream.current_message_snapshot.usage
+# ===== END ANTHROPIC =====
+
+# ===== OPENAI =====
+class OpenAIEngine(Engine):
+    """Chat Completions API (requires the openai package).
+
+    OpenAI caches prompt prefixes automatically, so prompt caching here means keeping the
+    system prompt first and the history append-only; cache hits are reported in the usage.
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key):
+        try:
+            import openai
+        except ImportError:
+            raise ImportError("config.ENGINE = 'openai' requires the openai package (pip install openai)")
+        http_client = openai.DefaultHttpxClient(limits=http_limits(), timeout=config.HTTP_TIMEOUT)
+        self.client = openai.OpenAI(api_key=api_key, http_client=http_client)
+
+    def build_request(self, messages, context_manager=None):
+        request = self.base_request()
+        request["max_completion_tokens"] = request.pop("max_tokens")
+        request["messages"] = [{"role": "system", "content": config.SYSTEM_PROMPT}]
+        request["messages"] += self.context_messages(messages, context_manager)
+        return request
+
+    def stream(self, request, on_idle=None):
+        return _OpenAIStream(self.client, request)
+
+    def complete(self, system, prompt, max_tokens, model=None):
+        response = self.client.chat.completions.create(
+            model=model or config.MODEL,
+            max_completion_tokens=max_tokens,
+            messages=[{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+        )
+        return response.choices[0].message.content or ""
+
+class _OpenAIStream:
+    def __init__(self, client, request):
+        self._client = client
+        self._request = request
+        self._stream = None
+        self._usage = None
+
+    def __enter__(self):
+        self._stream = self._client.chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **self._request
+        )
+        return self
+
+    def __exit__(self, *exc_info):
+        # Closing the response drops the connection, which stops the generation
+        self._stream.close()
+
+    @property
+    def text_stream(self):
+        for chunk in self._stream:
+            # Usage arrives in a final chunk without choices
+            if chunk.usage is not None:
+                self._usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def usage(self, complete=True):
+        # A cancelled stream never receives the usage chunk
+        if self._usage is None:
+            return None
+        details = getattr(self._usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        return make_usage(
+            input_tokens=self._usage.prompt_tokens - cached,
+            output_tokens=self._usage.completion_tokens,
+            cache_read_input_tokens=cached,
+        )
+# ===== END OPENAI =====
+
+@st.cache_resource
+def get_engine(name, api_key):
+    """Process-wide engine for config.ENGINE ("anthropic", "openai" or "fake")."""
+    if name == "anthropic":
+        return AnthropicEngine(api_key)
+    if name == "openai":
+        return OpenAIEngine(api_key)
+    if name == "fake":
+        from fakes.engine import FakeEngine
+        return FakeEngine()
+    raise ValueError(f"Unknown engine: {name!r}")
@@ -0,0 +1 @@
+"""Local stand-ins for the external services the interview platform talks to."""
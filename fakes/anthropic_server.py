@@ -0,0 +1,181 @@
+#fakes/anthropic_server.py - Local stand-in for the Anthropic Messages API (streaming SSE and plain JSON)
+
+"""
+Serves POST /v1/messages the way the real API does, so interview.py can be
+driven offline by pointing the SDK at it with ANTHROPIC_BASE_URL. Replies
+are scripted: one interviewer question per turn, then a closing code once
+the conversation has `turns` participant answers.
+
+Usage: python -m fakes.anthropic_server [--port 8765] [--tokens-per-second 60]
+       [--ttft 0.4] [--error-rate 0.0] [--turns 6]
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY_TEMPLATE = ("Thank you, that is really helpful to hear. I would like to understand this part of your "
+                  "experience a little better before we move on. Could you tell me more about question {turn}?")
+
+class FakeAnthropicServer(ThreadingHTTPServer):
+    """
+    tokens_per_second: streaming rate of text deltas (one word per delta).
+    ttft: seconds before the first text delta.
+    error_rate: fraction of requests answered with 529 overloaded_error.
+    turns: participant answers after which the reply is closing_code.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, tokens_per_second=60.0, ttft=0.4, error_rate=0.0, turns=6, closing_code="x7y8",
+                 seed=None):
+        super().__init__(("127.0.0.1", port), _MessagesHandler)
+        self.tokens_per_second = tokens_per_second
+        self.ttft = ttft
+        self.error_rate = error_rate
+        self.turns = turns
+        self.closing_code = closing_code
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "streamed": 0, "errors": 0}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        """Serve from a daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, name="fake-anthropic", daemon=True).start()
+        return self
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def should_fail(self):
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def next_id(self):
+        with self._lock:
+            return f"msg_fake{next(self._ids):08d}"
+
+    def reply_for(self, request):
+        """Scripted interviewer reply for a request body."""
+        return scripted_reply(request.get("messages", []), self.turns, self.closing_code)
+
+def scripted_reply(messages, turns, closing_code):
+    """One question per participant answer, then the closing code after `turns` answers."""
+    # The opening "Hi" is not an answer
+    answers = sum(1 for m in messages if m.get("role") == "user") - 1
+    if answers >= turns:
+        return closing_code
+    return REPLY_TEMPLATE.format(turn=answers + 1)
+
+def _input_tokens(request):
+    """Crude input size so usage numbers move with the conversation."""
+    return len(json.dumps(request.get("messages", []))) // 4 + 1
+
+class _MessagesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_POST(self):
+        server = self.server
+        if self.path.split("?")[0] != "/v1/messages":
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        server.count("requests")
+        if server.should_fail():
+            server.count("errors")
+            self._send_json(529, {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}})
+            return
+
+        text = server.reply_for(request)
+        if request.get("stream"):
+            server.count("streamed")
+            self._stream(request, text)
+        else:
+            time.sleep(server.ttft)
+            self._send_json(200, self._message(request, text, output_tokens=len(text.split())))
+
+    def _message(self, request, text, output_tokens):
+        return {
+            "id": self.server.next_id(),
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake-model"),
+            "content": [{"type": "text", "text": text}] if text else [],
+            "stop_reason": "end_turn" if text else None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": _input_tokens(request), "output_tokens": output_tokens,
+                      "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0},
+        }
+
+    def _stream(self, request, text):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")  # the body ends when the connection does
+        self.end_headers()
+        self.close_connection = True
+
+        words = [word + " " for word in text.split(" ")]
+        words[-1] = words[-1].rstrip()
+        try:
+            start = self._message(request, "", output_tokens=1)
+            self._event("message_start", {"type": "message_start", "message": start})
+            self._event("content_block_start",
+                        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+            self._event("ping", {"type": "ping"})
+            time.sleep(self.server.ttft)
+            interval = 1.0 / self.server.tokens_per_second if self.server.tokens_per_second else 0
+            for i, word in enumerate(words):
+                if i and interval:
+                    time.sleep(interval)
+                self._event("content_block_delta",
+                            {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": word}})
+            self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+            self._event("message_delta", {"type": "message_delta",
+                                          "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                          "usage": {"output_tokens": len(words)}})
+            self._event("message_stop", {"type": "message_stop"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped the stream early
+
+    def _event(self, name, data):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--ttft", type=float, default=0.4, help="Seconds before the first token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 529")
+    parser.add_argument("--turns", type=int, default=6, help="Participant answers before the closing code")
+    args = parser.parse_args()
+
+    server = FakeAnthropicServer(args.port, args.tokens_per_second, args.ttft, args.error_rate, args.turns)
+    print(f"Fake Anthropic API on {server.base_url} (set ANTHROPIC_BASE_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,125 @@
+#fakes/drive.py - In-memory stand-in for the Google Drive v3 service used by batch_update_qualtrics.py
+
+import random
+import re
+import string
+from datetime import datetime, timedelta, timezone
+
+class _Request:
+    """Mimics a googleapiclient request: the call happens on execute()."""
+
+    def __init__(self, func, **kwargs):
+        self._func = func
+        self._kwargs = kwargs
+
+    def execute(self):
+        return self._func(**self._kwargs)
+
+class FakeDriveService:
+    """
+    Supports the calls the batch job makes: files().list with folder and
+    modifiedTime queries, changes().getStartPageToken and changes().list.
+    Page tokens are plain offsets, so results are deterministic.
+    """
+
+    def __init__(self):
+        self.files_by_id = {}
+        self.change_log = []  # file IDs in the order they changed
+        self.calls = []
+
+    # ----- test setup -----
+
+    def add_file(self, name, parent, modified_time=None, mime_type='text/plain'):
+        """Create a file in a folder and record it in the changes feed; returns its ID."""
+        file_id = f"file{len(self.files_by_id) + 1}"
+        modified_time = modified_time or datetime.now(timezone.utc)
+        self.files_by_id[file_id] = {
+            'id': file_id,
+            'name': name,
+            'mimeType': mime_type,
+            'parents': [parent],
+            'modifiedTime': modified_time.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            'trashed': False,
+        }
+        self.change_log.append(file_id)
+        return file_id
+
+    def add_transcripts(self, parent, count, seed=None, structured=True):
+        """Create `count` transcripts named like the interview app's; returns their Response IDs.
+
+        With `structured`, each .txt transcript gets its .jsonl copy next to it, as the app uploads.
+        """
+        rng = random.Random(seed)
+        alphabet = string.ascii_letters + string.digits
+        response_ids = []
+        for _ in range(count):
+            response_id = "R_" + "".join(rng.choices(alphabet, k=15))
+            timestamp = datetime(2026, 1, 1) + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            name = f"Claude_{response_id}_{timestamp:%Y-%m-%d_%H-%M-%S}"
+            self.add_file(f"{name}.txt", parent)
+            if structured:
+                self.add_file(f"{name}.jsonl", parent, mime_type='application/x-ndjson')
+            response_ids.append(response_id)
+        return response_ids
+
+    def trash_file(self, file_id):
+        self.files_by_id[file_id]['trashed'] = True
+        self.change_log.append(file_id)
+
+    # ----- Drive API surface -----
+
+    def files(self):
+        return self
+
+    def changes(self):
+        return _FakeChanges(self)
+
+    def list(self, q="", pageSize=100, pageToken=None, fields=None, **kwargs):
+        return _Request(self._list_files, q=q, page_size=pageSize, page_token=pageToken)
+
+    def _list_files(self, q, page_size, page_token):
+        self.calls.append(('files.list', page_token))
+        folder = re.search(r"'([^']+)' in parents", q)
+        cutoff = re.search(r"modifiedTime > '([^']+)'", q)
+        mime_type = re.search(r"mimeType = '([^']+)'", q)
+        matches = [
+            f for f in self.files_by_id.values()
+            if not f['trashed']
+            and (folder is None or folder.group(1) in f['parents'])
+            and (cutoff is None or f['modifiedTime'] > cutoff.group(1))
+            and (mime_type is None or f['mimeType'] == mime_type.group(1))
+        ]
+        return self._page('files', matches, page_size, page_token, ('id', 'name', 'mimeType', 'modifiedTime'))
+
+    def _page(self, key, items, page_size, page_token, keep):
+        start = int(page_token or 0)
+        page = [{k: item[k] for k in keep if k in item} for item in items[start:start + page_size]]
+        result = {key: page}
+        if start + page_size < len(items):
+            result['nextPageToken'] = str(start + page_size)
+        return result
+
+class _FakeChanges:
+    def __init__(self, drive):
+        self._drive = drive
+
+    def getStartPageToken(self, **kwargs):
+        return _Request(lambda: {'startPageToken': str(len(self._drive.change_log))})
+
+    def list(self, pageToken, pageSize=100, **kwargs):
+        return _Request(self._list_changes, page_token=pageToken, page_size=pageSize)
+
+    def _list_changes(self, page_token, page_size):
+        self._drive.calls.append(('changes.list', page_token))
+        start = int(page_token)
+        end = min(start + page_size, len(self._drive.change_log))
+        changes = [
+            {'fileId': file_id, 'removed': False, 'file': dict(self._drive.files_by_id[file_id])}
+            for file_id in self._drive.change_log[start:end]
+        ]
+        result = {'changes': changes}
+        if end < len(self._drive.change_log):
+            result['nextPageToken'] = str(end)
+        else:
+            result['newStartPageToken'] = str(end)
+        return result
@@ -0,0 +1,109 @@
+#fakes/drive_server.py - Local HTTP stand-in for the Google Drive v3 files.list and changes endpoints
+
+"""
+Serves the Drive v3 REST calls the batch job makes (files.list,
+changes.getStartPageToken, changes.list) over HTTP, backed by a
+FakeDriveService, with injectable latency and 404/429/5xx responses.
+A real googleapiclient service reaches it through
+build_drive_service(AnonymousCredentials(), api_endpoint=server.api_endpoint).
+
+Usage: python -m fakes.drive_server [--port 8767] [--folder ID] [--files N]
+       [--latency S] [--throttle-rate P] [--error-rate P]
+"""
+
+import argparse
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from fakes.drive import FakeDriveService
+from fakes.faults import FaultInjector, add_fault_arguments, faults_from_args
+
+class FakeDriveServer(ThreadingHTTPServer):
+    """HTTP front end for a FakeDriveService (`drive`), which holds the files."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, drive=None, faults=None):
+        super().__init__(("127.0.0.1", port), _DriveHandler)
+        self.drive = drive or FakeDriveService()
+        self.faults = faults or FaultInjector()
+        self.stats = Counter()  # "endpoint status" -> count
+        self._lock = threading.Lock()
+
+    @property
+    def api_endpoint(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/drive/v3/"
+
+    def start(self):
+        """Serve from a daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, name="fake-drive", daemon=True).start()
+        return self
+
+    def record(self, endpoint, status):
+        with self._lock:
+            self.stats[f"{endpoint} {status}"] += 1
+
+class _DriveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        server.faults.delay()
+
+        routes = {
+            "/drive/v3/files": ("files.list", lambda: server.drive.files().list(
+                q=params.get("q", ""), pageSize=int(params.get("pageSize", 100)), pageToken=params.get("pageToken"))),
+            "/drive/v3/changes/startPageToken": ("changes.getStartPageToken",
+                                                 lambda: server.drive.changes().getStartPageToken()),
+            "/drive/v3/changes": ("changes.list", lambda: server.drive.changes().list(
+                pageToken=params.get("pageToken"), pageSize=int(params.get("pageSize", 100)))),
+        }
+        if url.path not in routes:
+            return self._reply("unknown", 404, _error(404, "Not Found"))
+        endpoint, request = routes[url.path]
+
+        status = server.faults.pick_status()
+        if status == 429:
+            return self._reply(endpoint, 429, _error(429, "Rate Limit Exceeded"),
+                               {"Retry-After": str(server.faults.retry_after)})
+        if status is not None:
+            return self._reply(endpoint, status, _error(status, "Fake error"))
+        self._reply(endpoint, 200, request().execute())
+
+    def _reply(self, endpoint, status, body, headers=None):
+        self.server.record(endpoint, status)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def _error(status, message):
+    return {"error": {"code": status, "message": message, "errors": [{"message": message}]}}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--folder", default="fake-folder", help="Folder the synthetic transcripts are placed in")
+    parser.add_argument("--files", type=int, default=1000, help="Synthetic transcripts to create")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeDriveServer(args.port, faults=faults_from_args(args))
+    server.drive.add_transcripts(args.folder, args.files, seed=0)
+    print(f"Fake Drive API on {server.api_endpoint} with {args.files} transcripts in folder {args.folder!r}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,93 @@
+#fakes/engine.py - In-process model engine with scripted replies, for offline runs and benchmarks
+
+"""
+Selected with config.ENGINE = "fake". Replies follow the same script as
+fakes.anthropic_server (one question per answer, then the closing code),
+streamed one word at a time at `tokens_per_second` after `ttft` seconds,
+without any network. Set the class attributes before the engine is created
+to change the defaults for the whole process.
+"""
+
+import random
+import threading
+import time
+
+from engines import Engine, make_usage
+from fakes.anthropic_server import scripted_reply
+from token_accounting import estimate_request_tokens
+
+class FakeModelError(Exception):
+    """Raised for the fraction of requests picked by error_rate."""
+
+class FakeEngine(Engine):
+    name = "fake"
+    tokens_per_second = 60.0
+    ttft = 0.4
+    error_rate = 0.0
+    turns = 6
+    closing_code = "x7y8"
+
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "cancelled": 0, "errors": 0}
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def build_request(self, messages, context_manager=None):
+        request = self.base_request()
+        request["system"] = "fake system prompt"
+        request["messages"] = self.context_messages(messages, context_manager)
+        return request
+
+    def stream(self, request, on_idle=None):
+        self.count("requests")
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            self.count("errors")
+            raise FakeModelError("Overloaded (fake)")
+        text = scripted_reply(request["messages"], self.turns, self.closing_code)
+        return _FakeStream(self, text, estimate_request_tokens(request), on_idle)
+
+    def complete(self, system, prompt, max_tokens, model=None):
+        time.sleep(self.ttft)
+        return "Summary: " + " ".join(prompt.split()[:max_tokens // 4])
+
+class _FakeStream:
+    def __init__(self, engine, text, input_tokens, on_idle):
+        self._engine = engine
+        self._words = [word + " " for word in text.split(" ")]
+        self._words[-1] = self._words[-1].rstrip()
+        self._input_tokens = input_tokens
+        self._on_idle = on_idle
+        self._sent = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._sent < len(self._words):
+            self._engine.count("cancelled")
+
+    def _wait(self, seconds, poll_interval=0.25):
+        deadline = time.monotonic() + seconds
+        while (remaining := deadline - time.monotonic()) > 0:
+            time.sleep(min(remaining, poll_interval))
+            if self._on_idle is not None and remaining > poll_interval:
+                self._on_idle()
+
+    @property
+    def text_stream(self):
+        self._wait(self._engine.ttft)
+        interval = 1.0 / self._engine.tokens_per_second if self._engine.tokens_per_second else 0
+        for word in self._words:
+            if self._sent and interval:
+                time.sleep(interval)
+            self._sent += 1
+            yield word
+
+    def usage(self, complete=True):
+        return make_usage(input_tokens=self._input_tokens, output_tokens=self._sent)
@@ -0,0 +1,54 @@
+#fakes/faults.py - Injectable latency and error responses for the fake HTTP servers
+
+import random
+import threading
+import time
+
+class FaultInjector:
+    """
+    Decides, per request, how long to wait and whether to fail.
+
+    latency: seconds added to every request, plus up to `jitter` more.
+    not_found_rate / throttle_rate / error_rate: fraction of requests answered
+        with 404, 429 (with a Retry-After of `retry_after` seconds) or 503.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, not_found_rate=0.0, throttle_rate=0.0, error_rate=0.0,
+                 retry_after=1, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.not_found_rate = not_found_rate
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            extra = self._random.random() * self.jitter if self.jitter else 0.0
+        if self.latency or extra:
+            time.sleep(self.latency + extra)
+
+    def pick_status(self):
+        """HTTP status to fail this request with, or None to serve it normally."""
+        with self._lock:
+            roll = self._random.random()
+        for status, rate in ((404, self.not_found_rate), (429, self.throttle_rate), (503, self.error_rate)):
+            if roll < rate:
+                return status
+            roll -= rate
+        return None
+
+def add_fault_arguments(parser):
+    """Command-line options for a FaultInjector."""
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds per request")
+    parser.add_argument("--not-found-rate", type=float, default=0.0, help="Fraction of requests answered with 404")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--retry-after", type=float, default=1, help="Retry-After seconds sent with 429")
+
+def faults_from_args(args, seed=None):
+    return FaultInjector(args.latency, args.jitter, args.not_found_rate, args.throttle_rate, args.error_rate,
+                         args.retry_after, seed)
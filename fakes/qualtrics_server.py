@@ -0,0 +1,118 @@
+#fakes/qualtrics_server.py - Local stand-in for the Qualtrics v3 survey responses endpoint
+
+"""
+Serves GET and PUT /API/v3/surveys/{survey_id}/responses/{response_id}
+with injectable latency and 404/429/5xx responses. Point the batch job at
+it with QUALTRICS_BASE_URL.
+
+Usage: python -m fakes.qualtrics_server [--port 8766] [--latency S]
+       [--not-found-rate P] [--throttle-rate P] [--error-rate P]
+"""
+
+import argparse
+import json
+import re
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fakes.faults import FaultInjector, add_fault_arguments, faults_from_args
+
+_RESPONSE_PATH = re.compile(r"^/API/v3/surveys/([^/]+)/responses/([^/?]+)$")
+
+class FakeQualtricsServer(ThreadingHTTPServer):
+    """
+    Every Response ID exists unless listed in `missing` (or picked by the
+    injector's not_found_rate). Successful PUTs are kept in `updated`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, api_token="fake-token", faults=None, missing=()):
+        super().__init__(("127.0.0.1", port), _ResponsesHandler)
+        self.api_token = api_token
+        self.faults = faults or FaultInjector()
+        self.missing = set(missing)
+        self.updated = {}  # response ID -> embedded data of the last successful PUT
+        self.stats = Counter()  # "METHOD status" -> count
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        """Serve from a daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, name="fake-qualtrics", daemon=True).start()
+        return self
+
+    def record(self, method, status, response_id=None, embedded_data=None):
+        with self._lock:
+            self.stats[f"{method} {status}"] += 1
+            if embedded_data is not None:
+                self.updated[response_id] = embedded_data
+
+class _ResponsesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def _handle(self, method):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server.faults.delay()
+
+        match = _RESPONSE_PATH.match(self.path)
+        if not match:
+            return self._reply(method, 404, {"meta": {"httpStatus": "404 - Not Found"}})
+        response_id = match.group(2)
+        if self.headers.get("X-API-TOKEN") != server.api_token:
+            return self._reply(method, 401, {"meta": {"httpStatus": "401 - Unauthorized"}})
+
+        status = server.faults.pick_status()
+        if status is None and response_id in server.missing:
+            status = 404
+        if status == 429:
+            return self._reply(method, 429, {"meta": {"httpStatus": "429 - Too Many Requests"}},
+                               {"Retry-After": str(server.faults.retry_after)})
+        if status is not None:
+            return self._reply(method, status, {"meta": {"httpStatus": f"{status} - Fake error"}})
+
+        if method == "GET":
+            return self._reply(method, 200, {"result": {"responseId": response_id},
+                                             "meta": {"httpStatus": "200 - OK"}})
+        embedded_data = json.loads(body or b"{}").get("embeddedData", {})
+        self._reply(method, 200, {"meta": {"httpStatus": "200 - OK"}}, response_id=response_id,
+                    embedded_data=embedded_data)
+
+    def _reply(self, method, status, body, headers=None, response_id=None, embedded_data=None):
+        self.server.record(method, status, response_id, embedded_data)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--api-token", default="fake-token")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeQualtricsServer(args.port, args.api_token, faults_from_args(args))
+    print(f"Fake Qualtrics API on {server.base_url} (set QUALTRICS_BASE_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,12 @@
+#http_pool.py - Connection pool sizing shared by every model API client
+
+import httpx
+import config
+
+def http_limits():
+    """Pool limits for the sync and async API clients, so both are sized the same way."""
+    return httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+    )
@@ -6,48 +6,29 @@ from utils import (
     check_password,
     check_if_interview_completed,
     save_interview_data,
-    save_interview_data_to_drive,
+    snapshot_interview,
+    write_backup_snapshot,
+    export_interview_backup,
+    upload_transcript_snapshot,
+    upload_structured_transcript,
+    get_speaker_labels,
 )
 import os
 import config
+from write_behind import get_write_behind_queue
+from streaming import ThrottledRenderer, ClosingCodeMatcher, replay_stream
+from opening_cache import get_opening_cache
+from engines import get_engine, get_assistant_label
+from context_manager import ContextManager
+from token_accounting import estimate_request_tokens, record_turn_usage
+from metrics import TurnTimer, record_metric, register_gauge, start_prometheus_endpoint
+from transcript_records import record_message
+from session_store import get_session_store, is_storable_response_id, snapshot_session, restore_session
 import pytz
 import requests  # <<<< CHANGE 1: Added for Qualtrics API calls
-import re  # <<<< NEW: For single question enforcement
+from question_analysis import analyze_questions, should_truncate, StreamingQuestionDetector  # <<<< NEW: For single question enforcement
 
 from datetime import datetime
-import anthropic
-api = "anthropic"
-
-# ===== NEW: SINGLE QUESTION ENFORCEMENT =====
-def count_questions(text):
-    """Count the number of questions in a text response"""
-    question_marks = text.count('?')
-    
-    # Detect question patterns without question marks
-    question_patterns = [
-        r'\bcan you tell me\b',
-        r'\bcan you describe\b',
-        r'\bwhat (?:do|did|does|is|are|was|were)\b',
-        r'\bhow (?:do|did|does|is|are|was|were)\b',
-        r'\bwhy (?:do|did|does)\b',
-        r'\bcould you\b',
-        r'\bwould you\b'
-    ]
-    
-    pattern_count = sum(1 for pattern in question_patterns if re.search(pattern, text.lower()))
-    return max(question_marks, pattern_count)
-
-def enforce_single_question(response_text):
-    """Force response to contain only one question by truncating after first question"""
-    num_questions = count_questions(response_text)
-    
-    if num_questions > 1:
-        parts = response_text.split('?')
-        if len(parts) > 1:
-            return parts[0] + '?'
-    
-    return response_text
-# ===== END SINGLE QUESTION ENFORCEMENT =====
 
 # ===== CHANGE 2: QUALTRICS INTEGRATION START =====
 # Load Qualtrics credentials from environment
@@ -157,9 +138,21 @@ st.set_page_config(page_title="Interview - Anthropic", page_icon=config.AVATAR_I
 # Get current date and time in CT
 current_datetime = datetime.now(central_tz).strftime("%Y-%m-%d_%H-%M-%S")
 
+# ===== NEW: RESUME STORED SESSION =====
+# A refresh or dropped connection starts a new Streamlit session; if this Response ID
+# already has an interview in progress, pick it up instead of starting over
+session_store = get_session_store()
+if "messages" not in st.session_state and session_store is not None:
+    if is_storable_response_id(st.session_state.response_id):
+        try:
+            restore_session(session_store, st.session_state.response_id)
+        except Exception as e:
+            print(f"[SESSION ERROR] Could not resume {st.session_state.response_id}: {str(e)}")
+# ===== END RESUME STORED SESSION =====
+
 # Set the username with date and time - FIXED to properly use Response ID
 if "username" not in st.session_state or st.session_state.username is None:
-    model_prefix = "Claude"
+    model_prefix = get_assistant_label()
     # FIXED: Use 'response_id' instead of 'qualtrics_uid'
     uid_part = st.session_state.get('response_id', 'NoUID')
     if uid_part is None:
@@ -171,27 +164,60 @@ if "username" not in st.session_state or st.session_state.username is None:
 for directory in [config.TRANSCRIPTS_DIRECTORY, config.TIMES_DIRECTORY, config.BACKUPS_DIRECTORY]:
     os.makedirs(directory, exist_ok=True)
 
+# ===== NEW: WRITE-BEHIND PERSISTENCE =====
+# Backups and Drive uploads run on background workers so participants never wait on them
+write_behind = get_write_behind_queue()
+
+if config.METRICS_PROMETHEUS_PORT:
+    register_gauge("write_behind_queue_depth", write_behind.depth)
+    start_prometheus_endpoint(config.METRICS_PROMETHEUS_PORT)
+
+def queue_backup():
+    """Queue a snapshot of the conversation for the incremental backup."""
+    return write_behind.submit(
+        st.session_state.username,
+        write_backup_snapshot,
+        snapshot_interview(st.session_state.username),
+        config.BACKUPS_DIRECTORY,
+    )
+
+def save_session():
+    """Queue the session state for the durable session store."""
+    if session_store is None or not is_storable_response_id(st.session_state.response_id):
+        return None
+    return write_behind.submit(
+        st.session_state.username,
+        session_store.save,
+        st.session_state.response_id,
+        snapshot_session(),
+    )
+# ===== END WRITE-BEHIND PERSISTENCE =====
+
 # Initialise session state
 st.session_state.setdefault("interview_active", True)
 st.session_state.setdefault("messages", [])
+if "context_manager" not in st.session_state:
+    st.session_state.context_manager = ContextManager()
 
-# Check if interview previously completed
+# Check if interview previously completed (in-memory lookup by Response ID)
 interview_previously_completed = check_if_interview_completed(
-    config.TRANSCRIPTS_DIRECTORY, st.session_state.username
+    config.TRANSCRIPTS_DIRECTORY, st.session_state.response_id
     )
 
 # If app started but interview was previously completed
 if interview_previously_completed and not st.session_state.messages:
     st.session_state.interview_active = False
     completed_message = "Interview already completed."
+    st.info(completed_message)
     
 # Add 'Quit' button to dashboard
 col1, col2 = st.columns([0.85, 0.15])
 with col2:
     if st.session_state.interview_active and st.button("Quit", help="End the interview."):
         st.session_state.interview_active = False
-        st.session_state.messages.append({"role": "assistant", "content": "You have cancelled the interview."})
+        record_message("assistant", "You have cancelled the interview.")
         try:
+            save_session()
             save_interview_data(st.session_state.username, config.TRANSCRIPTS_DIRECTORY)
         except Exception as e:
             st.error(f"Error saving data: {str(e)}")
@@ -203,219 +229,256 @@ for message in st.session_state.messages[1:]:
         with st.chat_message(message["role"], avatar=avatar):
             st.markdown(message["content"])
 
-# Load API client
-if api == "openai":
-    client = OpenAI(api_key=st.secrets["API_KEY"])
-    api_kwargs = {"stream": True}
-elif api == "anthropic":
-    client = anthropic.Anthropic(api_key=st.secrets["API_KEY"])
-    api_kwargs = {"system": config.SYSTEM_PROMPT}
-
-# API kwargs
-api_kwargs.update({
-    "messages": st.session_state.messages,
-    "model": config.MODEL,
-    "max_tokens": config.MAX_OUTPUT_TOKENS,
-})
-if config.TEMPERATURE is not None:
-    api_kwargs["temperature"] = config.TEMPERATURE
+# Load the model engine selected by config.ENGINE (the fake engine needs no API key)
+engine = get_engine(config.ENGINE, st.secrets["API_KEY"] if config.ENGINE != "fake" else None)
 
-# Initialize first system message if history is empty
-if not st.session_state.messages:
-    if api == "openai":
-        st.session_state.messages.append({"role": "system", "content": config.SYSTEM_PROMPT})
-        with st.chat_message("assistant", avatar=config.AVATAR_INTERVIEWER):
-            try:
-                stream = client.chat.completions.create(**api_kwargs)
-                message_interviewer = st.write_stream(stream)
-            except Exception as e:
-                st.error(f"API Error: {str(e)}")
-                message_interviewer = "Sorry, there was an error connecting to the interview service. Please try again later."
+def get_request():
+    """Build the request for the current history (context management and prompt caching included)."""
+    return engine.build_request(st.session_state.messages, st.session_state.context_manager)
 
-    elif api == "anthropic":
-        st.session_state.messages.append({"role": "user", "content": "Hi"})
-        with st.chat_message("assistant", avatar=config.AVATAR_INTERVIEWER):
-            message_placeholder = st.empty()
-            message_interviewer = ""
+# Initialize first system message if history is empty
+if not st.session_state.messages and st.session_state.interview_active:
+    usage, latency = None, None
+    record_message("user", "Hi")
+    # The opening message only depends on the system prompt, engine and model, so it is
+    # generated once and replayed to later sessions without a model call
+    opening_cache = get_opening_cache()
+    opening_model = f"{config.ENGINE}:{config.MODEL}"
+    cached_opening = opening_cache.get(config.SYSTEM_PROMPT, opening_model) if opening_cache else None
+    with st.chat_message("assistant", avatar=config.AVATAR_INTERVIEWER):
+        message_placeholder = st.empty()
+        renderer = ThrottledRenderer(message_placeholder)
+        if cached_opening is not None:
+            for text_delta in replay_stream(cached_opening):
+                renderer.add(text_delta)
+            message_interviewer = cached_opening
+            message_placeholder.markdown(message_interviewer)
+            record_metric("opening_cache_hit", username=st.session_state.username)
+        else:
             try:
-                with client.messages.stream(**api_kwargs) as stream:
+                request = get_request()
+                estimated_input_tokens = estimate_request_tokens(request)
+                timer = TurnTimer()
+                with engine.stream(request, on_idle=renderer.refresh) as stream:
                     for text_delta in stream.text_stream:
-                        if text_delta:
-                            message_interviewer += text_delta
-                        message_placeholder.markdown(message_interviewer + "â–Œ")
+                        timer.mark_token(text_delta)
+                        renderer.add(text_delta)
+                    usage = record_turn_usage(stream.usage(), estimated_input_tokens)
+                timer.finish()
+                latency = timer.fields(usage["output_tokens"])
+                record_metric("turn", username=st.session_state.username, engine=config.ENGINE, model=config.MODEL,
+                              turn=usage["turn"], output_tokens=usage["output_tokens"], **latency)
+                message_interviewer = renderer.text
                 message_placeholder.markdown(message_interviewer)
+                if opening_cache and message_interviewer.strip():
+                    opening_cache.put(config.SYSTEM_PROMPT, opening_model, message_interviewer)
             except Exception as e:
                 st.error(f"API Error: {str(e)}")
                 message_interviewer = "Sorry, there was an error connecting to the interview service. Please try again later."
                 message_placeholder.markdown(message_interviewer)
 
-    st.session_state.messages.append({"role": "assistant", "content": message_interviewer})
+    record_message("assistant", message_interviewer, usage=usage, latency=latency)
 
     # Store initial backup
     try:
-        save_interview_data(
-            username=st.session_state.username,
-            transcripts_directory=config.BACKUPS_DIRECTORY,
-        )
+        queue_backup()
+        save_session()
     except Exception as e:
         st.error(f"Error saving backup: {str(e)}")
         
 # Main chat if interview is active
 if st.session_state.interview_active:
     if message_respondent := st.chat_input("Your message here"):
-        st.session_state.messages.append({"role": "user", "content": message_respondent})
+        record_message("user", message_respondent)
 
         with st.chat_message("user", avatar=config.AVATAR_RESPONDENT):
             st.markdown(message_respondent)
 
         with st.chat_message("assistant", avatar=config.AVATAR_INTERVIEWER):
             message_placeholder = st.empty()
-            message_interviewer = ""
-
+            # Deltas are coalesced into throttled re-renders; closing codes are
+            # detected incrementally and the match is reused after streaming
+            renderer = ThrottledRenderer(message_placeholder, min_chars=5)
+            matcher = ClosingCodeMatcher()
+            # Tracks questions while streaming so over-long replies can be stopped early
+            detector = StreamingQuestionDetector()
+
+            def reply_complete():
+                """True once the reply will be cut at its first question anyway."""
+                return config.STOP_AFTER_FIRST_QUESTION and should_truncate(detector.update(renderer.text))
+
+            timer = TurnTimer()
+            stopped_early = False
+            usage = None
             try:
-                if api == "openai":
-                    stream = client.chat.completions.create(**api_kwargs)
-                    for message in stream:
-                        text_delta = message.choices[0].delta.content
-                        if text_delta:
-                            message_interviewer += text_delta
-                        if len(message_interviewer) > 5:
-                            message_placeholder.markdown(message_interviewer + "â–Œ")
-                        if any(code in message_interviewer for code in config.CLOSING_MESSAGES.keys()):
+                request = get_request()
+                estimated_input_tokens = estimate_request_tokens(request)
+                with engine.stream(request, on_idle=renderer.refresh) as stream:
+                    for text_delta in stream.text_stream:
+                        timer.mark_token(text_delta)
+                        renderer.add(text_delta)
+                        if matcher.feed(text_delta):
                             message_placeholder.empty()
+                            stopped_early = True
                             break
-
-                elif api == "anthropic":
-                    with client.messages.stream(**api_kwargs) as stream:
-                        for text_delta in stream.text_stream:
-                            if text_delta:
-                                message_interviewer += text_delta
-                            if len(message_interviewer) > 5:
-                                message_placeholder.markdown(message_interviewer + "â–Œ")
-                            if any(code in message_interviewer for code in config.CLOSING_MESSAGES.keys()):
-                                message_placeholder.empty()
-                                break
+                        if reply_complete():
+                            stopped_early = True
+                            break
+                    # Leaving the block closes the connection and cancels generation, so an
+                    # early stop has no final output count; it is estimated from the text
+                    usage = record_turn_usage(stream.usage(complete=not stopped_early), estimated_input_tokens,
+                                              partial_text=renderer.text if stopped_early else None)
+                message_interviewer = renderer.text
+                closing_code = matcher.match
             except Exception as e:
                 st.error(f"API Error: {str(e)}")
                 message_interviewer = "Sorry, there was an error. Your response was saved, but we couldn't generate a reply."
+                closing_code = None
+            timer.finish()
             
             # ===== NEW: ENFORCE SINGLE QUESTION =====
             # Apply enforcement BEFORE displaying or saving the message
             # EXCEPT for the final summary/rating question which must stay intact
-            if not any(code in message_interviewer for code in config.CLOSING_MESSAGES.keys()):
-                # Don't enforce if this is the summary + rating question
-                # Check for key phrases that indicate we're in the conclusion
-                is_conclusion = (
-                    "To conclude" in message_interviewer or
-                    "how well does" in message_interviewer.lower() or
-                    "1 = poorly" in message_interviewer or
-                    "scale of 1" in message_interviewer.lower()
-                )
-    
-                if not is_conclusion:
-                    message_interviewer = enforce_single_question(message_interviewer)
+            enforcement_start = time.monotonic()
+            if closing_code is None:
+                analysis = analyze_questions(message_interviewer)
+                if should_truncate(analysis):
+                    message_interviewer = message_interviewer[:analysis.spans[0][1]]
+            enforcement_seconds = time.monotonic() - enforcement_start
             # ===== END ENFORCEMENT =====
+
+            output_tokens = usage["output_tokens"] if usage else None
+            partial = bool(usage and usage.get("partial"))
+            # Estimated output counts would make tokens/sec meaningless, so it is left out for them
+            latency = timer.fields(None if partial else output_tokens)
+            latency["enforcement_s"] = round(enforcement_seconds, 6)
+            record_metric("turn", username=st.session_state.username, engine=config.ENGINE, model=config.MODEL,
+                          turn=usage["turn"] if usage else None, output_tokens=output_tokens,
+                          output_tokens_estimated=partial, stopped_early=stopped_early, **latency)
                 
-            if not any(code in message_interviewer for code in config.CLOSING_MESSAGES.keys()):
+            if closing_code is None:
                 message_placeholder.markdown(message_interviewer)
-                st.session_state.messages.append({"role": "assistant", "content": message_interviewer})
+                record_message("assistant", message_interviewer, usage=usage, latency=latency)
 
                 try:
-                    save_interview_data(
-                        username=st.session_state.username,
-                        transcripts_directory=config.BACKUPS_DIRECTORY,
-                    )
+                    queue_backup()
+                    save_session()
                 except Exception as e:
                     st.warning(f"Failed to save backup: {str(e)}")
 
-            for code in config.CLOSING_MESSAGES.keys():
-                if code in message_interviewer:
-                    display_message = config.CLOSING_MESSAGES[code]
-                    st.session_state.messages.append({"role": "assistant", "content": display_message})
-                    st.session_state.interview_active = False
-                    st.markdown(display_message)
-                    
-                    # ===== DISPLAY DEBRIEFING =====
-                    st.markdown("---")
-                    st.success("🎉 Interview completed successfully!")
-                    
-                    # Display debriefing information
-                    st.markdown("---")
-                    st.header(config.DEBRIEFING_TITLE, divider="blue")
-                    
-                    st.markdown(config.DEBRIEFING_INTRO)
-                    st.markdown(config.DEBRIEFING_STUDY_DESIGN)
-                    st.markdown(config.DEBRIEFING_WHY_NOT_TOLD)
-                    st.markdown(config.DEBRIEFING_QUESTIONS)
-                    
-                    # Highlighted withdrawal section
-                    with st.container():
-                        st.info("📋 " + config.DEBRIEFING_WITHDRAWAL)
-                    
-                    st.markdown(config.DEBRIEFING_IRB)
-                    st.markdown(config.DEBRIEFING_CLOSING)
-                    
-                    st.markdown("---")
-                    st.info("✅ You may now close this window. Your participation is complete.")
-                    # ===== END DEBRIEFING DISPLAY =====
-                    
-                    # ===== CHANGE 3: NOTIFY QUALTRICS OF COMPLETION =====
-                    # Silently attempt to notify Qualtrics (logs to Render, not visible to user)
-                    response_id = st.session_state.get('response_id')
-                    mark_chatbot_complete(response_id)  # Always call, even if None (for logging)
-                    # ===== CHANGE 3: END =====
-
-                    final_transcript_stored = False
-                    retries = 0
-                    max_retries = 10
-                    transcript_path = None
+            if closing_code is not None:
+                display_message = config.CLOSING_MESSAGES[closing_code]
+                record_message("assistant", display_message, usage=usage, latency=latency)
+                st.session_state.interview_active = False
+                st.markdown(display_message)
+                
+                # ===== DISPLAY DEBRIEFING =====
+                st.markdown("---")
+                st.success("🎉 Interview completed successfully!")
+                
+                # Display debriefing information
+                st.markdown("---")
+                st.header(config.DEBRIEFING_TITLE, divider="blue")
+                
+                st.markdown(config.DEBRIEFING_INTRO)
+                st.markdown(config.DEBRIEFING_STUDY_DESIGN)
+                st.markdown(config.DEBRIEFING_WHY_NOT_TOLD)
+                st.markdown(config.DEBRIEFING_QUESTIONS)
+                
+                # Highlighted withdrawal section
+                with st.container():
+                    st.info("📋 " + config.DEBRIEFING_WITHDRAWAL)
+                
+                st.markdown(config.DEBRIEFING_IRB)
+                st.markdown(config.DEBRIEFING_CLOSING)
+                
+                st.markdown("---")
+                st.info("✅ You may now close this window. Your participation is complete.")
+                # ===== END DEBRIEFING DISPLAY =====
+                
+                # ===== CHANGE 3: NOTIFY QUALTRICS OF COMPLETION =====
+                # Silently attempt to notify Qualtrics (logs to Render, not visible to user)
+                response_id = st.session_state.get('response_id')
+                mark_chatbot_complete(response_id)  # Always call, even if None (for logging)
+                # ===== CHANGE 3: END =====
+
+                # Bring the incremental backup up to date and assemble its text view
+                try:
+                    queue_backup()
+                    save_session()
+                    pending_write = write_behind.submit(
+                        st.session_state.username,
+                        export_interview_backup,
+                        st.session_state.username,
+                        config.BACKUPS_DIRECTORY,
+                    )
+                except Exception as e:
+                    pending_write = None
+                    st.warning(f"Failed to finalize backup: {str(e)}")
+
+                final_transcript_stored = False
+                retries = 0
+                max_retries = 10
+                transcript_path = None
+                
+                while not final_transcript_stored and retries < max_retries:
+                    try:
+                        transcript_path = save_interview_data(
+                            username=st.session_state.username,
+                            transcripts_directory=config.TRANSCRIPTS_DIRECTORY,
+                        )
+                        final_transcript_stored = transcript_path is not None and os.path.exists(transcript_path)
+                    except Exception as e:
+                        st.warning(f"Retry {retries+1}/{max_retries}: Error saving transcript - {str(e)}")
                     
-                    while not final_transcript_stored and retries < max_retries:
-                        try:
-                            transcript_path = save_interview_data(
-                                username=st.session_state.username,
-                                transcripts_directory=config.TRANSCRIPTS_DIRECTORY,
-                            )
-                            final_transcript_stored = check_if_interview_completed(config.TRANSCRIPTS_DIRECTORY, st.session_state.username)
-                        except Exception as e:
-                            st.warning(f"Retry {retries+1}/{max_retries}: Error saving transcript - {str(e)}")
-                        
-                        time.sleep(0.1)
-                        retries += 1
+                    time.sleep(0.1)
+                    retries += 1
 
-                    if retries == max_retries and not final_transcript_stored:
-                        st.error("Error: Interview transcript could not be saved properly after multiple attempts!")
+                if retries == max_retries and not final_transcript_stored:
+                    st.error("Error: Interview transcript could not be saved properly after multiple attempts!")
+                    
+                    # Create emergency local transcript with custom labels
+                    emergency_file = f"emergency_transcript_{st.session_state.username}.txt"
+                    try:
+                        # Determine speaker labels
+                        user_label, assistant_label = get_speaker_labels()
                         
-                        # Create emergency local transcript with custom labels
-                        emergency_file = f"emergency_transcript_{st.session_state.username}.txt"
-                        try:
-                            # Determine speaker labels
-                            user_label = st.session_state.get('response_id', 'user')
-                            if user_label is None or user_label == 'None':
-                                user_label = 'user'
-                            assistant_label = 'Claude'  # Since this is the Anthropic version
-                            
-                            with open(emergency_file, "w") as t:
-                                for message in st.session_state.messages:
-                                    if message.get('role') == 'system':
-                                        continue
-                                    
-                                    # Use custom labels instead of generic roles
-                                    if message['role'] == 'user':
-                                        speaker_label = user_label
-                                    elif message['role'] == 'assistant':
-                                        speaker_label = assistant_label
-                                    else:
-                                        speaker_label = message['role']
-                                    
-                                    t.write(f"{speaker_label}: {message['content']}\n\n")
-                            transcript_path = emergency_file
-                            st.success(f"Created emergency transcript: {emergency_file}")
-                        except Exception as e:
-                            st.error(f"Failed to create emergency transcript: {str(e)}")
-
-                    if transcript_path:
-                        try:
-                            save_interview_data_to_drive(transcript_path)
-                        except Exception as e:
-                            st.error(f"Failed to upload to Google Drive: {str(e)}")
+                        with open(emergency_file, "w") as t:
+                            for message in st.session_state.messages:
+                                if message.get('role') == 'system':
+                                    continue
+                                
+                                # Use custom labels instead of generic roles
+                                if message['role'] == 'user':
+                                    speaker_label = user_label
+                                elif message['role'] == 'assistant':
+                                    speaker_label = assistant_label
+                                else:
+                                    speaker_label = message['role']
+                                
+                                t.write(f"{speaker_label}: {message['content']}\n\n")
+                        transcript_path = emergency_file
+                        st.success(f"Created emergency transcript: {emergency_file}")
+                    except Exception as e:
+                        st.error(f"Failed to create emergency transcript: {str(e)}")
+
+                if transcript_path:
+                    try:
+                        pending_write = write_behind.submit(
+                            st.session_state.username,
+                            upload_transcript_snapshot,
+                            snapshot_interview(st.session_state.username),
+                            transcript_path,
+                        )
+                        transcript_id = pending_write.result(timeout=config.WRITE_BEHIND_FLUSH_TIMEOUT)
+                        st.success(f"Files uploaded! Transcript ID: {transcript_id}")
+                        # The JSONL copy is for analysis only, so the participant does not wait for it
+                        write_behind.submit(st.session_state.username, upload_structured_transcript, transcript_path)
+                    except Exception as e:
+                        st.error(f"Failed to upload to Google Drive: {str(e)}")
+                elif pending_write is not None:
+                    # Flush this session's queued backups before the interview ends
+                    try:
+                        pending_write.result(timeout=config.WRITE_BEHIND_FLUSH_TIMEOUT)
+                    except Exception as e:
+                        st.warning(f"Failed to finalize backup: {str(e)}")
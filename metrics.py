@@ -0,0 +1,133 @@
+#metrics.py - Per-turn latency instrumentation: JSON lines file and optional Prometheus endpoint
+
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+
+_lock = threading.Lock()
+_metrics_file = None
+_summaries = {}  # metric name -> [count, sum]
+_gauges = {}  # metric name -> callable returning the current value
+_server = None
+
+def record_metric(event, **fields):
+    """Append one JSON line for event and add its *_s timings to the Prometheus summaries."""
+    global _metrics_file
+    record = {"ts": datetime.now(timezone.utc).isoformat(), "event": event, **fields}
+    with _lock:
+        for key, value in fields.items():
+            if key.endswith("_s") and isinstance(value, (int, float)):
+                summary = _summaries.setdefault(f"{event}_{key[:-2]}_seconds", [0, 0.0])
+                summary[0] += 1
+                summary[1] += value
+        if config.METRICS_FILE:
+            try:
+                if _metrics_file is None:
+                    os.makedirs(os.path.dirname(config.METRICS_FILE) or ".", exist_ok=True)
+                    _metrics_file = open(config.METRICS_FILE, "a", buffering=1)
+                _metrics_file.write(json.dumps(record) + "\n")
+            except OSError as e:
+                print(f"[METRICS ERROR] Could not write metrics: {str(e)}")
+    return record
+
+def timed(event):
+    """Decorator recording the duration and outcome of each call as a metric."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.monotonic()
+            ok = False
+            try:
+                result = func(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                record_metric(event, duration_s=round(time.monotonic() - start, 4), ok=ok)
+        return wrapper
+    return decorator
+
+def register_gauge(name, func):
+    """Expose func() as a gauge on the Prometheus endpoint."""
+    with _lock:
+        _gauges[name] = func
+
+class TurnTimer:
+    """Timestamps of one model call: request sent, first token, stream finished."""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.first_token = None
+        self.end = None
+
+    def mark_token(self, delta):
+        if delta and self.first_token is None:
+            self.first_token = time.monotonic()
+
+    def finish(self):
+        self.end = time.monotonic()
+
+    def fields(self, output_tokens=None):
+        """Timing fields for record_metric: TTFT, stream duration and tokens per second."""
+        end = self.end or time.monotonic()
+        fields = {"stream_s": round(end - self.start, 4)}
+        if self.first_token is not None:
+            fields["ttft_s"] = round(self.first_token - self.start, 4)
+            generation = end - self.first_token
+            if output_tokens and generation > 0:
+                fields["tokens_per_sec"] = round(output_tokens / generation, 2)
+        return fields
+
+# ==================== PROMETHEUS ENDPOINT ====================
+
+def render_prometheus():
+    """Current summaries and gauges in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for name, (count, total) in sorted(_summaries.items()):
+            lines.append(f"# TYPE interview_{name} summary")
+            lines.append(f"interview_{name}_count {count}")
+            lines.append(f"interview_{name}_sum {total}")
+        gauges = sorted(_gauges.items())
+    for name, func in gauges:
+        try:
+            value = func()
+        except Exception:
+            continue
+        lines.append(f"# TYPE interview_{name} gauge")
+        lines.append(f"interview_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep scrapes out of the app logs
+
+def start_prometheus_endpoint(port):
+    """Serve /metrics on port from a background thread (once per process)."""
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        except OSError as e:
+            print(f"[METRICS ERROR] Could not start Prometheus endpoint on port {port}: {str(e)}")
+            return None
+    threading.Thread(target=_server.serve_forever, name="metrics-endpoint", daemon=True).start()
+    print(f"[METRICS] Prometheus endpoint listening on port {port}")
+    return _server
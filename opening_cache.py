@@ -0,0 +1,63 @@
+#opening_cache.py - Opening interviewer message generated once per system prompt and model
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+import streamlit as st
+import config
+from atomic_files import atomic_write
+
+def opening_cache_key(system_prompt, model):
+    """File-safe key that changes whenever the system prompt or the model does."""
+    digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    return f"{model}-{digest[:32]}"
+
+class OpeningMessageCache:
+    """Stores the first assistant message on disk and keeps loaded entries in memory."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, system_prompt, model):
+        """Cached opening message text, or None if it has not been generated yet."""
+        key = opening_cache_key(system_prompt, model)
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+        try:
+            with open(self._path(key), "r") as f:
+                text = json.load(f)["text"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        with self._lock:
+            self._entries[key] = text
+        return text
+
+    def put(self, system_prompt, model, text):
+        key = opening_cache_key(system_prompt, model)
+        record = {
+            "model": model,
+            "system_prompt_sha256": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            "created_at": datetime.now().isoformat(),
+            "text": text,
+        }
+        # Replace atomically so concurrent sessions never read a partial file
+        atomic_write(self._path(key), json.dumps(record))
+        with self._lock:
+            self._entries[key] = text
+        print(f"[OPENING CACHE] Stored opening message for {key}")
+
+@st.cache_resource
+def get_opening_cache():
+    """Process-wide opening message cache (None if disabled)."""
+    if not config.OPENING_MESSAGE_CACHE:
+        return None
+    return OpeningMessageCache(config.OPENING_CACHE_DIRECTORY)
@@ -0,0 +1,113 @@
+#question_analysis.py - Single-pass question detection for single-question enforcement
+
+import re
+from collections import namedtuple
+
+# One alternation covers question marks and the phrasings that count as a question
+# even without a question mark. Each cue is a named group, so a match can be
+# attributed to its cue without re-scanning the text.
+_QUESTION_SCAN = re.compile(
+    r"(?P<question_mark>\?)"
+    # Cheap first-character check so most positions are rejected before trying each cue
+    r"|(?=[cwhCWH])\b(?:"
+    r"(?P<can_you_tell>can you tell me)"
+    r"|(?P<can_you_describe>can you describe)"
+    r"|(?P<what>what (?:do|did|does|is|are|was|were))"
+    r"|(?P<how>how (?:do|did|does|is|are|was|were))"
+    r"|(?P<why>why (?:do|did|does))"
+    r"|(?P<could_you>could you)"
+    r"|(?P<would_you>would you)"
+    r")\b",
+    re.IGNORECASE,
+)
+
+# Phrases that mark the final summary + rating message, which must stay intact
+_CONCLUSION_MARKERS = ("To conclude", "1 = poorly")
+_CONCLUSION_MARKERS_LOWER = ("how well does", "scale of 1")
+
+# Longer than any cue or conclusion marker, so text re-scanned after a new delta
+# catches matches that straddle the previous end of the text
+_RESCAN_OVERLAP = 24
+
+QuestionAnalysis = namedtuple("QuestionAnalysis", ["count", "spans", "is_conclusion"])
+QuestionAnalysis.__doc__ = """Result of analyze_questions.
+
+count: number of questions, the larger of the question-mark count and the number of
+    distinct question phrasings found.
+spans: (start, end) offsets of each sentence ending in a question mark, in order.
+is_conclusion: the text is the final summary + rating message, which is never truncated.
+"""
+
+class StreamingQuestionDetector:
+    """Analyzes a response while it streams, scanning each new part of the text once."""
+
+    def __init__(self):
+        self._question_marks = 0
+        self._cues = set()
+        self._spans = []
+        self._is_conclusion = False
+        self._previous_end = 0
+        self._scanned = 0
+
+    def update(self, text, final=False):
+        """Scan text added since the last call (text must extend the previous text)."""
+        scan_from = max(0, self._scanned - _RESCAN_OVERLAP)
+        if not self._is_conclusion:
+            window = text[scan_from:]
+            lowered = window.lower()
+            self._is_conclusion = (
+                any(marker in window for marker in _CONCLUSION_MARKERS)
+                or any(marker in lowered for marker in _CONCLUSION_MARKERS_LOWER)
+            )
+
+        for match in _QUESTION_SCAN.finditer(text, scan_from):
+            kind = match.lastgroup
+            if kind == "question_mark":
+                if match.start() < self._scanned:
+                    continue  # counted by an earlier scan
+                self._question_marks += 1
+                # The question sentence starts after the nearest boundary since the last question
+                end = match.start()
+                start = max(
+                    text.rfind(".", self._previous_end, end),
+                    text.rfind("!", self._previous_end, end),
+                    text.rfind("\n", self._previous_end, end),
+                    self._previous_end - 1,
+                ) + 1
+                while start < end and text[start].isspace():
+                    start += 1
+                self._spans.append((start, match.end()))
+                self._previous_end = match.end()
+            elif match.end() < len(text) or final:
+                # A cue at the very end may still be extended by the next delta
+                self._cues.add(kind)
+
+        self._scanned = len(text)
+        return self.analysis
+
+    @property
+    def analysis(self):
+        return QuestionAnalysis(
+            max(self._question_marks, len(self._cues)), list(self._spans), self._is_conclusion
+        )
+
+def analyze_questions(text):
+    """Scan text once and return its QuestionAnalysis."""
+    return StreamingQuestionDetector().update(text, final=True)
+
+def should_truncate(analysis):
+    """True if the response asks more than one question and is not the final summary."""
+    return analysis.count > 1 and bool(analysis.spans) and not analysis.is_conclusion
+
+def count_questions(text):
+    """Count the number of questions in a text response"""
+    return analyze_questions(text).count
+
+def enforce_single_question(response_text):
+    """Force response to contain only one question by truncating after first question"""
+    analysis = analyze_questions(response_text)
+
+    if analysis.count > 1 and analysis.spans:
+        return response_text[:analysis.spans[0][1]]
+
+    return response_text
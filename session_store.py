@@ -0,0 +1,117 @@
+#session_store.py - Durable interview state keyed by Response ID, so reconnects resume the interview
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+import streamlit as st
+import config
+from atomic_files import atomic_write
+
+# Session state that is saved after every turn and restored on reconnect
+SESSION_STATE_KEYS = [
+    "username",
+    "interview_start_time",
+    "interview_active",
+    "messages",
+    "message_annotations",
+    "turn_usage",
+    "token_totals",
+]
+
+class SQLiteSessionStore:
+    """One row per Response ID holding the session state as JSON."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " response_id TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def load(self, response_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT state FROM sessions WHERE response_id = ?", (response_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, response_id, state):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO sessions (response_id, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(response_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                (response_id, json.dumps(state), datetime.now().isoformat()),
+            )
+            self.conn.commit()
+
+    def delete(self, response_id):
+        with self.lock:
+            self.conn.execute("DELETE FROM sessions WHERE response_id = ?", (response_id,))
+            self.conn.commit()
+
+class FileSessionStore:
+    """One JSON file per Response ID in a directory."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def _path(self, response_id):
+        return os.path.join(self.directory, f"{response_id}.json")
+
+    def load(self, response_id):
+        try:
+            with open(self._path(response_id), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, response_id, state):
+        # Replace atomically so a crash never leaves a half-written session
+        atomic_write(self._path(response_id), json.dumps(state))
+
+    def delete(self, response_id):
+        try:
+            os.remove(self._path(response_id))
+        except FileNotFoundError:
+            pass
+
+SESSION_STORE_BACKENDS = {
+    "sqlite": SQLiteSessionStore,
+    "file": FileSessionStore,
+}
+
+@st.cache_resource
+def get_session_store():
+    """Process-wide session store chosen by config.SESSION_STORE_BACKEND (None if disabled)."""
+    if not config.SESSION_STORE_BACKEND:
+        return None
+    return SESSION_STORE_BACKENDS[config.SESSION_STORE_BACKEND](config.SESSION_STORE_PATH)
+
+def is_storable_response_id(response_id):
+    """True for a real Response ID. Placeholders ("NoUID", "None") would merge participants,
+    so sessions, completion checks and the completion index ignore them."""
+    return bool(response_id) and response_id not in ("NoUID", "None")
+
+def snapshot_session():
+    """The session state to store, copied so it can be saved from a worker thread."""
+    return json.loads(json.dumps({key: st.session_state[key] for key in SESSION_STATE_KEYS
+                                  if key in st.session_state}))
+
+def restore_session(store, response_id):
+    """Load a stored session into st.session_state; returns True if one was found."""
+    state = store.load(response_id)
+    if not state:
+        return False
+    for key, value in state.items():
+        st.session_state[key] = value
+    print(f"[SESSION] Resumed {response_id} with {len(state.get('messages', []))} messages")
+    return True
@@ -0,0 +1,71 @@
+#streaming.py - Helpers for rendering streamed interviewer responses
+
+import re
+import time
+import config
+
+class ThrottledRenderer:
+    """Accumulates streamed text and re-renders the placeholder at most once per interval.
+
+    Every st.markdown call re-sends the whole message, so a render also waits until the
+    text has grown by `growth` times what was last rendered. The rendered lengths then
+    form a geometric series, keeping the bytes sent per reply linear in its length.
+    """
+
+    def __init__(self, placeholder, interval=None, growth=None, min_chars=0, cursor="▌"):
+        self.placeholder = placeholder
+        self.interval = config.STREAM_RENDER_INTERVAL if interval is None else interval
+        self.growth = config.STREAM_RENDER_GROWTH if growth is None else growth
+        self.min_chars = min_chars
+        self.cursor = cursor
+        self.text = ""
+        self._last_render = 0.0
+        self._rendered_length = 0
+
+    def add(self, delta):
+        """Append a delta, re-rendering only if the time and growth budgets allow it."""
+        if delta:
+            self.text += delta
+        now = time.monotonic()
+        if (now - self._last_render >= self.interval
+                and len(self.text) > self.min_chars
+                and len(self.text) > self._rendered_length * (1 + self.growth)):
+            self.placeholder.markdown(self.text + self.cursor)
+            self._last_render = now
+            self._rendered_length = len(self.text)
+
+    def refresh(self):
+        """Re-render the current text; also lets Streamlit stop the script run if it was asked to."""
+        self.placeholder.markdown(self.text + self.cursor)
+
+class ClosingCodeMatcher:
+    """Detects closing codes in a streamed response, looking at each delta only once.
+
+    Only the last (longest code - 1) characters are kept between deltas, so a code
+    split across deltas is still found while each delta costs O(len(delta)).
+    """
+
+    def __init__(self, codes=None):
+        codes = list(config.CLOSING_MESSAGES if codes is None else codes)
+        self._pattern = re.compile("|".join(re.escape(code) for code in codes))
+        self._overlap = max(len(code) for code in codes) - 1
+        self._tail = ""
+        self.match = None
+
+    def feed(self, delta):
+        """Scan a new delta; returns the first closing code seen so far, or None."""
+        if self.match is None and delta:
+            window = self._tail + delta
+            found = self._pattern.search(window)
+            if found:
+                self.match = found.group(0)
+            self._tail = window[-self._overlap:] if self._overlap else ""
+        return self.match
+
+def replay_stream(text, interval=None):
+    """Yield stored text word by word, paced like a live model stream."""
+    interval = config.OPENING_STREAM_INTERVAL if interval is None else interval
+    for i, word in enumerate(re.findall(r"\S+\s*|\s+", text)):
+        if i and interval:
+            time.sleep(interval)
+        yield word
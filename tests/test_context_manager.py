@@ -0,0 +1,34 @@
+#tests/test_context_manager.py - Summarization boundaries of ContextManager
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from context_manager import ContextManager
+from fakes.engine import FakeEngine
+
+def interview(answers):
+    """'Hi', the opening question, then `answers` answer/question pairs ending on an answer."""
+    messages = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Question 1? " * 20}]
+    for i in range(answers):
+        messages.append({"role": "user", "content": f"Answer {i + 1}. " * 20})
+        messages.append({"role": "assistant", "content": f"Question {i + 2}? " * 20})
+    return messages[:-1]
+
+@pytest.mark.parametrize("keep_recent", [0, 1])
+def test_summarizes_without_dropping_the_latest_turn(keep_recent):
+    engine = FakeEngine()
+    engine.ttft = 0
+    manager = ContextManager(budget=50, keep_recent=keep_recent)
+    messages = interview(answers=3)
+
+    manager.build_messages(engine, messages)
+    manager._pending.result(timeout=5)
+    context = manager.build_messages(engine, messages)
+
+    assert manager.summarized_count == len(messages) - 1
+    assert [m["role"] for m in context] == ["user"]
+    assert context[0]["content"][0]["text"].startswith("[Summary of the interview so far]")
+    assert context[0]["content"][-1]["text"] == messages[-1]["content"]
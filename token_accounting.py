@@ -0,0 +1,56 @@
+#token_accounting.py - Local token estimates and per-turn usage accounting for each session
+
+import streamlit as st
+
+USAGE_FIELDS = ["input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"]
+
+def estimate_tokens(text):
+    """Rough local token estimate (about four characters per token for English text)."""
+    return len(text) // 4 + 1
+
+def content_text(content):
+    """Plain text of message content given as a string or a list of text blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content)
+
+def estimate_request_tokens(request_kwargs):
+    """Estimate the input tokens of a messages request before it is sent."""
+    total = 0
+    if request_kwargs.get("system"):
+        total += estimate_tokens(content_text(request_kwargs["system"]))
+    for message in request_kwargs.get("messages", []):
+        total += estimate_tokens(content_text(message["content"])) + 4  # per-message overhead
+    return total
+
+def record_turn_usage(usage, estimated_input_tokens=None, partial_text=None):
+    """Store a finished turn's token usage in the session and add it to the running totals.
+
+    partial_text is the reply received before streaming was stopped early. The provider has
+    not reported the output tokens yet, so they are estimated from it and the record is
+    marked partial.
+    """
+    turn_usage = st.session_state.setdefault("turn_usage", [])
+    record = {"turn": len(turn_usage) + 1, "estimated_input_tokens": estimated_input_tokens}
+    for field in USAGE_FIELDS:
+        record[field] = getattr(usage, field, None) or 0
+    if partial_text is not None:
+        record["partial"] = True
+        record["output_tokens"] = max(record["output_tokens"], estimate_tokens(partial_text))
+        if usage is None and estimated_input_tokens:
+            record["input_tokens"] = estimated_input_tokens
+    turn_usage.append(record)
+
+    totals = st.session_state.setdefault("token_totals", dict.fromkeys(USAGE_FIELDS, 0))
+    for field in USAGE_FIELDS:
+        totals[field] += record[field]
+
+    print(f"[TOKENS] Turn {record['turn']}: estimated {estimated_input_tokens} input, "
+          f"{record['input_tokens']} uncached input, {record['cache_read_input_tokens']} cache read, "
+          f"{record['cache_creation_input_tokens']} cache write, {record['output_tokens']} output"
+          + (" (estimated, stopped early)" if record.get("partial") else ""))
+    return record
+
+def get_token_totals():
+    """Running token totals for the current session."""
+    return st.session_state.get("token_totals", dict.fromkeys(USAGE_FIELDS, 0))
@@ -0,0 +1,129 @@
+#transcript_records.py - Structured JSONL transcripts: a header record plus one record per turn
+
+import json
+from datetime import datetime
+import pytz
+import streamlit as st
+from atomic_files import atomic_write
+
+TRANSCRIPT_FORMAT_VERSION = 1
+
+# Text header label -> JSON field of the header record, in transcript order
+HEADER_FIELDS = [
+    ("API", "api"),
+    ("Model", "model"),
+    ("Start Time (CT)", "start_time"),
+    ("End Time (CT)", "end_time"),
+    ("Username", "username"),
+    ("UID", "response_id"),
+    ("Number of Responses", "number_of_responses"),
+    ("Qualtrics Notification Status", "qualtrics_status"),
+    ("Input Tokens", "input_tokens"),
+    ("Cache Read Tokens", "cache_read_input_tokens"),
+    ("Cache Write Tokens", "cache_creation_input_tokens"),
+    ("Output Tokens", "output_tokens"),
+]
+
+central_tz = pytz.timezone("America/Chicago")
+
+def record_message(role, content, **annotations):
+    """Append a message to the conversation, keeping its timestamp, usage and latency alongside.
+
+    Annotations live in a list parallel to st.session_state.messages so the messages
+    themselves stay in the exact shape the model APIs accept.
+    """
+    message_annotations = st.session_state.setdefault("message_annotations", [])
+    # Messages appended without annotations leave gaps; pad so indexes stay aligned
+    message_annotations.extend({} for _ in range(len(st.session_state.messages) - len(message_annotations)))
+    st.session_state.messages.append({"role": role, "content": content})
+    message_annotations.append({"timestamp": datetime.now(central_tz).isoformat(), **annotations})
+
+def header_record(metadata, labels):
+    """JSON header record built from the transcript metadata and speaker labels."""
+    record = {"type": "header", "format_version": TRANSCRIPT_FORMAT_VERSION}
+    for label, field in HEADER_FIELDS:
+        record[field] = metadata.get(label)
+    record["user_label"], record["assistant_label"] = labels
+    return record
+
+def turn_records(messages, annotations):
+    """One JSON record per conversation turn, skipping the system prompt."""
+    index = 0
+    for position, message in enumerate(messages):
+        if message.get('role') == 'system':
+            continue
+        annotation = annotations[position] if position < len(annotations) else {}
+        yield {
+            "type": "turn",
+            "index": index,
+            "role": message["role"],
+            "content": message["content"],
+            "timestamp": annotation.get("timestamp"),
+            "usage": annotation.get("usage"),
+            "latency": annotation.get("latency"),
+        }
+        index += 1
+
+def write_jsonl(path, records):
+    """Write records as JSON lines, replacing path atomically."""
+    atomic_write(path, "".join(json.dumps(record) + "\n" for record in records))
+
+def write_structured_transcript(snapshot, path):
+    """Write a session snapshot as a JSONL transcript (header record, then turns)."""
+    header = header_record(snapshot["metadata"], snapshot["labels"])
+    write_jsonl(path, [header, *turn_records(snapshot["messages"], snapshot["annotations"])])
+    return path
+
+def read_structured_transcript(path):
+    """Return (header, turns) from a JSONL transcript."""
+    header, turns = None, []
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("type") == "header":
+                header = record
+            else:
+                turns.append(record)
+    return header, turns
+
+# ==================== TEXT VIEW ====================
+
+def format_transcript_header(metadata):
+    """Render the metadata header block that opens every transcript."""
+    lines = ["=== INTERVIEW METADATA ==="]
+    lines += [f"{key}: {value}" for key, value in metadata.items()]
+    lines.append("========================")
+    return "\n".join(lines) + "\n\n"
+
+def format_transcript_messages(messages, user_label, assistant_label):
+    """Render messages as `Speaker: content` blocks, skipping the system prompt."""
+    parts = []
+    for message in messages:
+        if message.get('role') == 'system':
+            continue
+
+        # Use custom labels instead of generic role names
+        if message['role'] == 'user':
+            speaker_label = user_label
+        elif message['role'] == 'assistant':
+            speaker_label = assistant_label
+        else:
+            speaker_label = message['role']  # fallback
+
+        parts.append(f"{speaker_label}: {message['content']}\n\n")
+    return "".join(parts)
+
+def render_text_transcript(header, turns):
+    """Derive the plain-text transcript from structured records."""
+    metadata = {label: header.get(field) for label, field in HEADER_FIELDS}
+    return (format_transcript_header(metadata)
+            + format_transcript_messages(turns, header["user_label"], header["assistant_label"]))
+
+def export_text_transcript(jsonl_path, text_path):
+    """Write the text view of a JSONL transcript to text_path."""
+    header, turns = read_structured_transcript(jsonl_path)
+    with open(text_path, "w") as t:
+        t.write(render_text_transcript(header, turns))
+    return text_path
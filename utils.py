@@ -2,13 +2,28 @@
 
 import streamlit as st
 import hmac
+import functools
 import time
 import io
 import os
+import json
 from datetime import datetime
 from google.oauth2.service_account import Credentials 
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload
+from drive_service import build_drive_service
+from token_accounting import get_token_totals
+from metrics import timed
+from atomic_files import atomic_write
+from completion_index import get_completion_index
+from session_store import is_storable_response_id
+from transcript_records import (
+    header_record,
+    turn_records,
+    write_structured_transcript,
+    export_text_transcript,
+    render_text_transcript,
+)
+from engines import get_assistant_label
 import config
 import pytz
 
@@ -38,15 +53,16 @@ if "response_id" not in st.session_state:
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 FOLDER_ID = "1-y9bGuI0nmK22CPXg804U5nZU3gA--lV"  # Your Google Drive folder ID
 
+@functools.lru_cache(maxsize=None)
 def authenticate_google_drive():
-    """Authenticate using a service account and return the Google Drive service."""
+    """Authenticate using a service account and return the process-wide Google Drive service."""
     key_path = "/etc/secrets/service-account.json"
 
     if not os.path.exists(key_path):
         raise FileNotFoundError("Google Drive credentials file not found!")
 
     creds = Credentials.from_service_account_file(key_path, scopes=SCOPES)
-    return build("drive", "v3", credentials=creds)
+    return build_drive_service(creds)
 
 def upload_file_to_drive(service, file_path, file_name, mimetype='text/plain'):
     """Upload a file to a specific Google Drive folder."""
@@ -74,75 +90,76 @@ def get_speaker_labels():
     if user_label is None or user_label == 'None':
         user_label = 'user'
     
-    # Determine AI model label based on config.MODEL
-    api_type = 'openai' if 'gpt' in config.MODEL.lower() else 'anthropic'
-    assistant_label = 'Claude' if api_type == 'anthropic' else 'ChatGPT'
+    # Determine AI model label based on config.ENGINE
+    assistant_label = get_assistant_label()
     
     return user_label, assistant_label
 
-def save_interview_data_to_drive(transcript_path):
-    """Save interview transcript & timing data to Google Drive with custom speaker labels."""
-    
-    if st.session_state.username is None:
-        # Define a fallback username with timestamp if none exists
-        central_tz = pytz.timezone("America/Chicago")
-        current_datetime = datetime.now(central_tz).strftime("%Y-%m-%d_%H-%M-%S")
-        st.session_state.username = f"User_{current_datetime}"
-
-    # Before uploading the file, make sure it contains the full conversation
-    # This creates a fresh transcript with all messages to ensure completeness
-    if os.path.exists(transcript_path):
-        try:
-            # Define Central Time (CT) timezone
-            central_tz = pytz.timezone("America/Chicago")
-            # Get current date and time in CT
-            current_time = datetime.now(central_tz).strftime("%Y-%m-%d %H:%M:%S %Z")
-            
-            # Get custom speaker labels
-            user_label, assistant_label = get_speaker_labels()
-            
-            with open(transcript_path, "w") as t:
-                # Add metadata header with complete information
-                t.write("=== INTERVIEW METADATA ===\n")
-                # Determine API based on config.MODEL since OpenAI and Anthropic have different model naming conventions
-                api_type = 'openai' if 'gpt' in config.MODEL.lower() else 'anthropic'
-                t.write(f"API: {api_type}\n")
-                t.write(f"Model: {config.MODEL}\n")
-                t.write(f"Start Time (CT): {st.session_state.get('interview_start_time', 'Unknown')}\n")
-                t.write(f"End Time (CT): {current_time}\n")
-                t.write(f"Username: {st.session_state.username}\n")
-                t.write(f"UID: {st.session_state.get('response_id', 'None')}\n")
-                t.write(f"Number of Responses: {len([m for m in st.session_state.messages if m['role'] == 'user'])}\n")
-                # ===== CHANGE 4: ADD QUALTRICS STATUS TO METADATA =====
-                t.write(f"Qualtrics Notification Status: {st.session_state.get('qualtrics_status', 'Not attempted')}\n")
-                # ===== CHANGE 4: END =====
-                t.write("========================\n\n")
-                
-                # Skip the system prompt (first message) when saving the transcript
-                for message in st.session_state.messages:
-                    if message.get('role') == 'system':
-                        continue
-                    
-                    # Use custom labels instead of generic role names
-                    if message['role'] == 'user':
-                        speaker_label = user_label
-                    elif message['role'] == 'assistant':
-                        speaker_label = assistant_label
-                    else:
-                        speaker_label = message['role']  # fallback for any other roles
-                    
-                    t.write(f"{speaker_label}: {message['content']}\n\n")
-                    
-        except Exception as e:
-            st.error(f"Error updating transcript before upload: {str(e)}")
+@timed("drive_upload")
+def upload_transcript_snapshot(snapshot, transcript_path):
+    """Rewrite a transcript (and its JSONL copy) from a snapshot and upload the text file to Google Drive.
+
+    Returns the text file's ID; the JSONL copy is uploaded separately by upload_structured_transcript.
+    """
+    jsonl_path = get_structured_transcript_path(transcript_path)
+    write_structured_transcript(snapshot, jsonl_path)
+    export_text_transcript(jsonl_path, transcript_path)
 
     service = authenticate_google_drive()  # Authenticate Drive API
+    return upload_file_to_drive(service, transcript_path, os.path.basename(transcript_path))
 
-    try:
-        transcript_id = upload_file_to_drive(service, transcript_path, os.path.basename(transcript_path))
-        st.success(f"Files uploaded! Transcript ID: {transcript_id}")
-    except Exception as e:
-        st.error(f"Failed to upload files: {e}")
+@timed("drive_upload_structured")
+def upload_structured_transcript(transcript_path):
+    """Upload the JSONL transcript next to transcript_path to Google Drive; returns its ID."""
+    jsonl_path = get_structured_transcript_path(transcript_path)
+    service = authenticate_google_drive()  # Authenticate Drive API
+    return upload_file_to_drive(service, jsonl_path, os.path.basename(jsonl_path), mimetype='application/x-ndjson')
+
+@timed("save_transcript")
+def write_transcript_files(snapshot, transcript_path):
+    """Store the structured transcript, then derive the text view from it."""
+    jsonl_path = get_structured_transcript_path(transcript_path)
+    write_structured_transcript(snapshot, jsonl_path)
+    export_text_transcript(jsonl_path, transcript_path)
+    return transcript_path
+
+def get_structured_transcript_path(transcript_path):
+    """Path of the JSONL transcript that a text transcript is derived from."""
+    return os.path.splitext(transcript_path)[0] + ".jsonl"
+
+def get_transcript_metadata(username):
+    """Collect the transcript metadata header fields for the current session."""
+    # Define Central Time (CT) timezone
+    central_tz = pytz.timezone("America/Chicago")
+    # Get current date and time in CT
+    current_time = datetime.now(central_tz).strftime("%Y-%m-%d %H:%M:%S %Z")
+
+    # Provider engine the interview ran on
+    api_type = config.ENGINE
+
+    # Get UID from various possible names (for backward compatibility)
+    uid = (st.session_state.get('response_id') or
+           st.session_state.get('qualtrics_uid') or
+           st.session_state.get('qualtrics_response_id') or
+           'None')
+
+    # Running token usage of the session
+    totals = get_token_totals()
+
+    return {
+        "API": api_type,
+        "Model": config.MODEL,
+        "Start Time (CT)": st.session_state.get('interview_start_time', 'Unknown'),
+        "End Time (CT)": current_time,
+        "Username": username,
+        "UID": uid,
+        "Number of Responses": len([m for m in st.session_state.messages if m['role'] == 'user']),
+        "Qualtrics Notification Status": st.session_state.get('qualtrics_status', 'Not attempted'),
+        "Input Tokens": totals["input_tokens"],
+        "Cache Read Tokens": totals["cache_read_input_tokens"],
+        "Cache Write Tokens": totals["cache_creation_input_tokens"],
+        "Output Tokens": totals["output_tokens"],
+    }
 
 def save_interview_data(username, transcripts_directory, times_directory=None, file_name_addition_transcript="", file_name_addition_time=""):
     """Write interview data to disk with custom speaker labels."""
@@ -167,55 +184,12 @@ def save_interview_data(username, transcripts_directory, times_directory=None, f
     # Create proper file paths
     transcript_file = os.path.join(transcripts_directory, f"{username}{file_name_addition_transcript}.txt")
 
-    # Get custom speaker labels
-    user_label, assistant_label = get_speaker_labels()
-
-    # Store chat transcript
     try:
-        # Define Central Time (CT) timezone
-        central_tz = pytz.timezone("America/Chicago")
-        # Get current date and time in CT
-        current_time = datetime.now(central_tz).strftime("%Y-%m-%d %H:%M:%S %Z")
-        
-        # Determine API type based on config.MODEL
-        api_type = 'openai' if 'gpt' in config.MODEL.lower() else 'anthropic'
-        
-        with open(transcript_file, "w") as t:
-            # Add metadata header with complete information
-            t.write("=== INTERVIEW METADATA ===\n")
-            t.write(f"API: {api_type}\n")
-            t.write(f"Model: {config.MODEL}\n")
-            t.write(f"Start Time (CT): {st.session_state.get('interview_start_time', 'Unknown')}\n")
-            t.write(f"End Time (CT): {current_time}\n")
-            t.write(f"Username: {username}\n")
-            
-            # Get UID from various possible names (for backward compatibility)
-            uid = (st.session_state.get('response_id') or 
-                   st.session_state.get('qualtrics_uid') or 
-                   st.session_state.get('qualtrics_response_id') or 
-                   'None')
-            t.write(f"UID: {uid}\n")
-            
-            t.write(f"Number of Responses: {len([m for m in st.session_state.messages if m['role'] == 'user'])}\n")
-            # ===== CHANGE 4: ADD QUALTRICS STATUS TO METADATA =====
-            t.write(f"Qualtrics Notification Status: {st.session_state.get('qualtrics_status', 'Not attempted')}\n")
-            # ===== CHANGE 4: END =====
-            t.write("========================\n\n")
-            
-            # Skip the system prompt when saving the transcript and use custom labels
-            for message in st.session_state.messages:
-                if message.get('role') == 'system':
-                    continue
-                
-                # Use custom labels instead of generic role names
-                if message['role'] == 'user':
-                    speaker_label = user_label
-                elif message['role'] == 'assistant':
-                    speaker_label = assistant_label
-                else:
-                    speaker_label = message['role']  # fallback
-                
-                t.write(f"{speaker_label}: {message['content']}\n\n")
+        write_transcript_files(snapshot_interview(username), transcript_file)
+
+        response_id = st.session_state.get('response_id')
+        if is_storable_response_id(response_id):
+            get_completion_index(transcripts_directory).add(response_id)
         
         return transcript_file
         
@@ -223,6 +197,76 @@ def save_interview_data(username, transcripts_directory, times_directory=None, f
         st.error(f"Error saving transcript: {str(e)}")
         return None
 
+# ===== INCREMENTAL BACKUPS =====
+# Backups are split into a small JSON header record, rewritten on every save, and an
+# append-only JSONL file of turn records. Each save therefore only writes the turns
+# added since the previous one instead of the whole conversation.
+
+def get_backup_paths(username, backups_directory):
+    """Return the (header record, turns file) paths of an incremental backup."""
+    header_path = os.path.join(backups_directory, f"{username}.header.json")
+    turns_path = os.path.join(backups_directory, f"{username}.turns.jsonl")
+    return header_path, turns_path
+
+def snapshot_interview(username):
+    """Capture everything needed to persist the transcript outside the script thread."""
+    return {
+        "username": username,
+        "messages": [dict(m) for m in st.session_state.messages],
+        "annotations": [dict(a) for a in st.session_state.get("message_annotations", [])],
+        "metadata": get_transcript_metadata(username),
+        "labels": get_speaker_labels(),
+    }
+
+@timed("backup_write")
+def write_backup_snapshot(snapshot, backups_directory):
+    """Append a snapshot's unwritten turns to its backup and refresh the header record."""
+    os.makedirs(backups_directory, exist_ok=True)
+    header_path, turns_path = get_backup_paths(snapshot["username"], backups_directory)
+
+    # The header record remembers how many messages are already in the turns file
+    messages_written = 0
+    if os.path.exists(header_path):
+        with open(header_path, "r") as h:
+            messages_written = json.load(h).get("messages_written", 0)
+
+    turns = list(turn_records(snapshot["messages"], snapshot["annotations"]))
+    new_turns = turns[messages_written:]
+
+    if new_turns:
+        with open(turns_path, "a") as t:
+            t.writelines(json.dumps(turn) + "\n" for turn in new_turns)
+
+    record = {
+        "header": header_record(snapshot["metadata"], snapshot["labels"]),
+        "messages_written": len(turns),
+    }
+    # Replace the header atomically so a crash never leaves it half-written
+    atomic_write(header_path, json.dumps(record))
+
+    return turns_path
+
+def export_interview_backup(username, backups_directory):
+    """Assemble an incremental backup into a `{username}.txt` transcript."""
+    header_path, turns_path = get_backup_paths(username, backups_directory)
+    if not os.path.exists(header_path):
+        return None
+
+    with open(header_path, "r") as h:
+        record = json.load(h)
+
+    turns = []
+    if os.path.exists(turns_path):
+        with open(turns_path, "r") as f:
+            turns = [json.loads(line) for line in f if line.strip()]
+
+    transcript_file = os.path.join(backups_directory, f"{username}.txt")
+    with open(transcript_file, "w") as t:
+        t.write(render_text_transcript(record["header"], turns))
+
+    return transcript_file
+# ===== END INCREMENTAL BACKUPS =====
+
 # Password screen for dashboard (note: only very basic authentication!)
 # Based on https://docs.streamlit.io/knowledge-base/deploy/authentication-without-sso
 def check_password():
@@ -259,10 +303,8 @@ def check_password():
     return False, st.session_state.username
 
 
-def check_if_interview_completed(directory, username):
-    """Check if interview transcript/time file exists."""
-    if username is None:
+def check_if_interview_completed(directory, response_id):
+    """Check if a transcript has already been saved for this Response ID."""
+    if not is_storable_response_id(response_id):
         return False
-    if username != "testaccount":
-        return os.path.exists(os.path.join(directory, f"{username}.txt"))
-    return False
+    return response_id in get_completion_index(directory)
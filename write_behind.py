@@ -0,0 +1,92 @@
+#write_behind.py - Background persistence of transcript snapshots to disk and Google Drive
+
+import atexit
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+import streamlit as st
+import config
+
+class WriteBehindQueue:
+    """Bounded queues drained by worker threads that run save jobs off the script thread.
+
+    Jobs are routed by key (the session username), so each session is always handled
+    by the same worker and its backups are written in the order they were submitted.
+    """
+
+    def __init__(self, num_workers, max_size):
+        self._queues = [queue.Queue(maxsize=max_size) for _ in range(num_workers)]
+        self._workers = []
+        for index, job_queue in enumerate(self._queues):
+            worker = threading.Thread(
+                target=self._run, args=(job_queue,), name=f"write-behind-{index}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+        atexit.register(self.shutdown)
+
+    def _run(self, job_queue):
+        """Worker loop: run jobs until the shutdown sentinel arrives."""
+        while True:
+            job = job_queue.get()
+            try:
+                if job is None:
+                    return
+                future, func, args = job
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(func(*args))
+                    except Exception as e:
+                        print(f"[WRITE-BEHIND ERROR] {getattr(func, '__name__', func)} failed: {str(e)}")
+                        future.set_exception(e)
+            finally:
+                job_queue.task_done()
+
+    def submit(self, key, func, *args):
+        """Queue func(*args) for the worker that owns key; returns a Future.
+
+        When that worker's queue is full, the caller blocks until a slot frees up, which
+        keeps memory bounded without reordering a session's writes.
+        """
+        future = Future()
+        job_queue = self._queues[zlib.crc32(key.encode()) % len(self._queues)]
+        if job_queue.full():
+            print(f"[WRITE-BEHIND] Queue full, waiting to save for {key}")
+        job_queue.put((future, func, args))
+        return future
+
+    def depth(self):
+        """Number of jobs waiting across all workers."""
+        return sum(job_queue.qsize() for job_queue in self._queues)
+
+    def flush(self, timeout=None):
+        """Wait until every queued job has finished; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for job_queue in self._queues:
+            with job_queue.all_tasks_done:
+                while job_queue.unfinished_tasks:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    job_queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout=None):
+        """Flush pending jobs and stop the workers."""
+        if timeout is None:
+            timeout = config.WRITE_BEHIND_FLUSH_TIMEOUT
+        if not self.flush(timeout):
+            print(f"[WRITE-BEHIND ERROR] Shutdown with {self.depth()} unsaved jobs")
+        for job_queue in self._queues:
+            try:
+                job_queue.put_nowait(None)
+            except queue.Full:
+                pass
+
+@st.cache_resource
+def get_write_behind_queue():
+    """Return the process-wide write-behind queue."""
+    return WriteBehindQueue(config.WRITE_BEHIND_WORKERS, config.WRITE_BEHIND_QUEUE_SIZE)